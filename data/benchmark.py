@@ -0,0 +1,195 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import random
+import timeit
+
+from employee import Employee
+from weekly_time_card import WeeklyTimeCard
+from week_calendar import WeekCalendar
+from overtime_rules import OvertimeRuleSet
+from time_card_generator import TimeCardGenerator
+
+
+class TimeCardBenchmark(object):
+    """
+    Micro-benchmarks for the core compute kernels: the weekly overtime calculation, the
+    multiple facility overtime evaluation, and the merging of the in/out hour lists.  Each
+    kernel is timed with randomized shift patterns at several sizes so that accidental
+    quadratic behavior shows up as a growth ratio well above the size ratio.  Every pattern
+    adds exactly `size` increments to each day, sized so they fit in the day without wrapping
+    around midnight (a size that does not fit raises an exception).  The number of in/out
+    blocks Monday holds after merging is printed next to each size: it is the size for every
+    pattern but `contiguous`, whose back to back increments are merged into a single block as
+    they are added (it exercises the merging itself).
+    """
+
+    WEEKLY_DATE_STR = '060523-061123'
+    SIZES = [4, 16, 64, 256]
+    MINUTES_IN_DAY = 1440
+    REPEAT = 5
+    NUMBER = 20
+
+    RANDOM = 'random'
+    TINY_INCREMENTS = 'tiny increments'
+    CONTIGUOUS = 'contiguous'
+    OVERNIGHT = 'overnight'
+    PATTERNS = [RANDOM, TINY_INCREMENTS, CONTIGUOUS, OVERNIGHT]
+
+    MAX_INC_MINUTES = 15            # longest increment of the random, tiny, and contiguous patterns
+    MAX_OVERNIGHT_INC_MINUTES = 480 # longest shift of the overnight pattern
+
+    def __init__(self, seed=0, overtime_rule_set=None):
+        self.random = random.Random(seed)
+        self.overtime_evaluator = (overtime_rule_set or OvertimeRuleSet()).compile()
+        self.week_calendar = WeekCalendar(self.WEEKLY_DATE_STR)
+
+    @staticmethod
+    def get_time_str(minutes):
+        """
+        Get the time string (ie `7:15AM`) for the given minutes since midnight.
+        :param minutes: minutes since midnight
+        :return: time string
+        """
+        hour, minute = divmod(minutes % TimeCardBenchmark.MINUTES_IN_DAY, 60)
+        meridiem = 'AM' if hour < 12 else 'PM'
+        return '{0}:{1:02d}{2}'.format(hour % 12 or 12, minute, meridiem)
+
+    def get_tci_str_list(self, pattern, size):
+        """
+        Get the list of time card increments strings for a single day using the given pattern:
+            - `random`: increments at random slots of the day, neither overlapping nor touching
+            - `tiny increments`: increments separated by a gap as long as the increments
+            - `contiguous`: back to back increments (merged into a single block)
+            - `overnight`: increments separated by a gap as long as the increments, the last one
+              running past midnight into the next day (before the increments of that day)
+        The increments are up to `MAX_INC_MINUTES` long (`MAX_OVERNIGHT_INC_MINUTES` overnight),
+        and shorter at the larger sizes so that all of them fit in the day.
+        :param pattern: name of the pattern
+        :param size: number of increments
+        :return: list of time card increments strings
+        """
+        if pattern == self.CONTIGUOUS:
+            # the last increment ends before midnight
+            length = min(self.MAX_INC_MINUTES, (self.MINUTES_IN_DAY - 1) // size)
+        elif pattern == self.OVERNIGHT:
+            length = min(self.MAX_OVERNIGHT_INC_MINUTES, self.MINUTES_IN_DAY // (2 * size))
+        else:
+            length = min(self.MAX_INC_MINUTES, self.MINUTES_IN_DAY // (2 * size))
+        # the overnight increments are at least 2 minutes long, to have a minute on each side of midnight
+        if length < (2 if pattern == self.OVERNIGHT else 1):
+            raise Exception('the {0} pattern can not fit {1} increments in a day'.format(pattern, size))
+        if pattern == self.RANDOM:
+            starts = sorted(self.random.sample(range(0, self.MINUTES_IN_DAY - length, 2 * length), size))
+        elif pattern == self.TINY_INCREMENTS:
+            first_start = self.random.randrange(0, self.MINUTES_IN_DAY - (2 * size - 1) * length)
+            starts = [first_start + 2 * length * idx for idx in range(size)]
+        elif pattern == self.CONTIGUOUS:
+            first_start = self.random.randrange(0, self.MINUTES_IN_DAY - size * length)
+            starts = [first_start + length * idx for idx in range(size)]
+        elif pattern == self.OVERNIGHT:
+            # the part after midnight of the previous day's last increment ends before the 1st start
+            last_start = self.MINUTES_IN_DAY - length // 2
+            starts = [last_start - 2 * length * (size - 1 - idx) for idx in range(size)]
+        else:
+            raise Exception('pattern must be one of {0}'.format(self.PATTERNS))
+        return ['{0}-{1}'.format(self.get_time_str(start), self.get_time_str(start + length)) for start in starts]
+
+    def get_weekly_time_card(self, pattern, size, employee_name='Bench Mark'):
+        """
+        Get a populated WeeklyTimeCard object using the given pattern and size for every day.
+        :param pattern: name of the pattern
+        :param size: number of increments per day
+        :param employee_name: employee name
+        :return: WeeklyTimeCard object
+        """
+        employee = Employee('B', employee_name, 'Bench Co dba Bench Facility')
+        weekly_time_card = WeeklyTimeCard(
+            self.WEEKLY_DATE_STR, employee, overtime_evaluator=self.overtime_evaluator, week_calendar=self.week_calendar
+        )
+        for day_idx in range(WeeklyTimeCard.DAYS_IN_WEEK):
+            for tci_str in self.get_tci_str_list(pattern, size):
+                weekly_time_card.add_time_inc(day_idx, tci_str)
+        return weekly_time_card
+
+    def time_kernel(self, func):
+        """
+        Time the given function and return the best time per call in microseconds.
+        :param func: function without arguments
+        :return: best time per call in microseconds
+        """
+        timings = timeit.repeat(func, repeat=self.REPEAT, number=self.NUMBER)
+        return min(timings) / self.NUMBER * 1e6
+
+    def bench_get_overtime_hours(self, pattern, size):
+        wtc = self.get_weekly_time_card(pattern, size)
+
+        def get_overtime_hours():
+            # the overtime hours are cached on the card, evaluate them every time
+            wtc.reset_overtime_hours()
+            return wtc.get_overtime_hours()
+        return self.time_kernel(get_overtime_hours)
+
+    def bench_evaluate_multiple_facilities(self, pattern, size):
+        wtc_1 = self.get_weekly_time_card(pattern, size)
+        wtc_2 = self.get_weekly_time_card(pattern, size)
+        return self.time_kernel(lambda: self.overtime_evaluator.evaluate([wtc_1, wtc_2]))
+
+    def bench_combine_in_out_hour_lists(self, pattern, size):
+        list_1 = self.get_weekly_time_card(pattern, size).daily_time_card_list[0].in_out_hours_list
+        list_2 = self.get_weekly_time_card(pattern, size).daily_time_card_list[0].in_out_hours_list
+        combine = TimeCardGenerator._TimeCardGenerator__combine_in_out_hour_lists
+        return self.time_kernel(lambda: combine(list_1, list_2))
+
+    def bench_add_time_inc(self, pattern, size):
+        tci_str_list = self.get_tci_str_list(pattern, size)
+
+        def populate():
+            weekly_time_card = WeeklyTimeCard(
+                self.WEEKLY_DATE_STR, Employee('B', 'Bench Mark', 'Bench Co'), week_calendar=self.week_calendar
+            )
+            for tci_str in tci_str_list:
+                weekly_time_card.add_time_inc(0, tci_str)
+        return self.time_kernel(populate)
+
+    def run(self, sizes=None, patterns=None):
+        """
+        Run every benchmark for every pattern and size, and print a table of the best time per
+        call along with the number of blocks of a day and the growth ratio between consecutive
+        sizes.
+        :param sizes: list of sizes (defaults to `SIZES`)
+        :param patterns: list of pattern names (defaults to `PATTERNS`)
+        :return: dictionary of (benchmark, pattern, size) -> microseconds
+        """
+        sizes = sizes or self.SIZES
+        patterns = patterns or list(self.PATTERNS)
+        benchmarks = [
+            ('get_overtime_hours', self.bench_get_overtime_hours),
+            ('evaluate_multiple_facilities', self.bench_evaluate_multiple_facilities),
+            ('combine_in_out_hour_lists', self.bench_combine_in_out_hour_lists),
+            ('add_time_inc', self.bench_add_time_inc),
+        ]
+        results = {}
+        print('{0:<42}{1:<18}{2:>8}{3:>8}{4:>14}{5:>10}'.format(
+            'Benchmark', 'Pattern', 'Size', 'Blocks', 'us/call', 'Growth'
+        ))
+        for name, bench in benchmarks:
+            for pattern in patterns:
+                previous_us = None
+                for size in sizes:
+                    us = bench(pattern, size)
+                    results[(name, pattern, size)] = us
+                    n_blocks = len(self.get_weekly_time_card(pattern, size).daily_time_card_list[0].in_out_hours_list)
+                    growth = '{0:.1f}x'.format(us / previous_us) if previous_us else ''
+                    print('{0:<42}{1:<18}{2:>8}{3:>8}{4:>14.1f}{5:>10}'.format(name, pattern, size, n_blocks, us, growth))
+                    previous_us = us
+        return results
+
+
+if __name__ == "__main__":
+    print('Start Benchmarking TimeCardGenerator...\n')
+
+    test_benchmark = TimeCardBenchmark()
+    test_benchmark.run()
+
+    print('\nEnd Benchmarking TimeCardGenerator\n')
@@ -0,0 +1,93 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import re
+from contextlib import ExitStack
+
+
+class CombinedTimeCards(object):
+    """
+    Print-ready documents of the time cards: instead of an html file per time card, a single
+    html document per group, with one stylesheet and a page break between the time cards (see
+    `WeeklyTimeCardTemplate.get_combined_head`).  Each time card is written to its document as
+    soon as it is rendered, so only one time card is in memory at a time.  The groups are:
+        - `week`: a document per week with the (combined) time cards of every employee
+        - `facility`: a document per facility with the facility time cards of every week
+    """
+
+    WEEK = 'week'
+    FACILITY = 'facility'
+    GROUP_BYS = [WEEK, FACILITY]
+
+    WEEK_X = 'week {0}'
+    INVALID_FILE_NAME_PATTERN = re.compile(r'[<>:"/\\|?*]')
+
+    def __init__(self, wtc_template, group_by=WEEK):
+        if group_by not in self.GROUP_BYS:
+            raise Exception('group_by must be one of {0}'.format(self.GROUP_BYS))
+        self.wtc_template = wtc_template
+        self.group_by = group_by
+
+    def iter_group_time_cards(self, tc_generator):
+        """
+        Iterate over the weekly time cards of every group, in output order.
+        :param tc_generator: TimeCardGenerator object
+        :return: generator of (group name, WeeklyTimeCard object)
+        """
+        if self.group_by == self.WEEK:
+            for pay_period in tc_generator.iter_pay_periods():
+                for week_idx, wtc in enumerate(pay_period.weekly_time_cards):
+                    if wtc:
+                        yield self.WEEK_X.format(week_idx + 1), wtc
+        else:
+            for weekly_timesheets in tc_generator.weekly_timesheets_list:
+                for timesheet in weekly_timesheets:
+                    for wtc in timesheet.id_wtc_dict.values():
+                        yield timesheet.entity_facility_name, wtc
+
+    def write(self, output_dir, tc_generator):
+        """
+        Write a combined document per group to the given output directory.
+        :param output_dir: output directory (ending with `/`)
+        :param tc_generator: TimeCardGenerator object
+        :return: list of the file paths written, in group order
+        """
+        group_file_dict = {}    # group name -> [file path, file, number of time cards]
+        with ExitStack() as stack:
+            for group_name, wtc in self.iter_group_time_cards(tc_generator):
+                group_file = group_file_dict.get(group_name)
+                if group_file is None:
+                    file_path = '{0}{1}.html'.format(output_dir, self.__get_file_name(group_name))
+                    file = stack.enter_context(open(file_path, 'w'))
+                    file.write(self.wtc_template.get_combined_head('Time Cards ({0})'.format(group_name)))
+                    group_file = group_file_dict[group_name] = [file_path, file, 0]
+                group_file[1].write(self.wtc_template.get_combined_card(wtc))
+                group_file[2] += 1
+            for file_path, file, count in group_file_dict.values():
+                file.write(self.wtc_template.get_combined_tail())
+                print(f"HTML file '{file_path}' has been created with {count} time cards.")
+        return [file_path for file_path, _, _ in group_file_dict.values()]
+
+    def __get_file_name(self, group_name):
+        """
+        Get the file name (without extension) for the given group name, without the characters
+        that are not allowed in file names.
+        :param group_name: group name
+        :return: file name
+        """
+        return self.INVALID_FILE_NAME_PATTERN.sub('_', group_name).strip().rstrip('.') or 'time cards'
+
+
+if __name__ == "__main__":
+    from time_card_generator import TimeCardGenerator
+
+    print('Start Testing CombinedTimeCards...\n')
+
+    test_tc_generator = TimeCardGenerator('resources/Schedule Example #3.xlsx')
+    for test_group_by in CombinedTimeCards.GROUP_BYS:
+        test_tc_generator.create_combined_time_cards(
+            'output/combined time cards ({0})/'.format(test_group_by),
+            'output/combined_time_cards ({0}).zip'.format(test_group_by), group_by=test_group_by
+        )
+
+    print('\nEnd Testing CombinedTimeCards\n')
@@ -0,0 +1,209 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import csv
+
+
+class CoverageReport(object):
+    """
+    Staffing coverage of each facility: the headcount of every time increment row of every day,
+    as counted by the Timesheet from the schedule grid (see `Timesheet.coverage_matrix`).  The
+    slots staffed below the minimum headcount are under covered.  The coverage is exported as
+    an html heatmap (one table per facility sheet) and as CSV (one record per slot).
+    """
+
+    DEFAULT_MINIMUM_HEADCOUNT = 1
+    FIELD_NAMES = [
+        'week', 'entity_facility_name', 'sheet_name', 'date', 'day', 'time_increment', 'headcount', 'under_covered'
+    ]
+
+    UNDER_COVERED_COLOR = '#f4a6a6'
+    COVERED_RGB = (76, 175, 80)     # darkest color, for the highest headcount of the sheet
+
+    def __init__(self, minimum_headcount=DEFAULT_MINIMUM_HEADCOUNT):
+        self.minimum_headcount = minimum_headcount
+
+    @staticmethod
+    def __get_weekly_coverage_timesheets(weekly_timesheets_list):
+        """
+        Get the timesheets with a coverage matrix (the timesheets loaded from a snapshot have none).
+        :param weekly_timesheets_list: list of lists of Timesheet objects, one list per week
+        :return: generator of (week number, Timesheet object)
+        """
+        for week_idx, weekly_timesheets in enumerate(weekly_timesheets_list):
+            for timesheet in weekly_timesheets:
+                if timesheet.coverage_matrix is not None:
+                    yield week_idx + 1, timesheet
+
+    def get_records(self, weekly_timesheets_list):
+        """
+        Get a record for each time increment of each day of each facility sheet.
+        :param weekly_timesheets_list: list of lists of Timesheet objects, one list per week
+        :return: generator of records (dict)
+        """
+        for week, timesheet in self.__get_weekly_coverage_timesheets(weekly_timesheets_list):
+            week_calendar = timesheet.get_week_calendar()
+            for day_idx, (wtc_date, day_name) in enumerate(zip(week_calendar.wtc_dates, week_calendar.day_names)):
+                for tci_str, headcount in zip(timesheet.tci_str_list, timesheet.coverage_matrix[:, day_idx].tolist()):
+                    yield {
+                        'week': week,
+                        'entity_facility_name': timesheet.entity_facility_name,
+                        'sheet_name': timesheet.sheet_name,
+                        'date': wtc_date,
+                        'day': day_name,
+                        'time_increment': tci_str,
+                        'headcount': headcount,
+                        'under_covered': headcount < self.minimum_headcount,
+                    }
+
+    def write_csv(self, file_path, weekly_timesheets_list):
+        """
+        Write the coverage records to the given CSV file path.
+        :param file_path: file path
+        :param weekly_timesheets_list: list of lists of Timesheet objects, one list per week
+        :return: number of records written
+        """
+        count = 0
+        with open(file_path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=self.FIELD_NAMES)
+            writer.writeheader()
+            for record in self.get_records(weekly_timesheets_list):
+                writer.writerow(record)
+                count += 1
+        print(f"Coverage file '{file_path}' has been created with {count} records.")
+        return count
+
+    def write_html(self, file_path, weekly_timesheets_list):
+        """
+        Write the coverage heatmap to the given html file path.
+        :param file_path: file path
+        :param weekly_timesheets_list: list of lists of Timesheet objects, one list per week
+        """
+        with open(file_path, 'w') as file:
+            file.write(self.get_html(weekly_timesheets_list))
+        print(f"HTML file '{file_path}' has been created.")
+
+    def get_html(self, weekly_timesheets_list):
+        """
+        Get the coverage heatmap: a table per facility sheet with a row per time increment and a
+        column per day.  The darker the cell, the higher the headcount; the under covered cells
+        are red.
+        :param weekly_timesheets_list: list of lists of Timesheet objects, one list per week
+        :return: html content
+        """
+        coverage_tables = [
+            self.__get_coverage_table(week, timesheet)
+            for week, timesheet in self.__get_weekly_coverage_timesheets(weekly_timesheets_list)
+        ]
+        return '''
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>Staffing Coverage</title>{style}
+        </head>
+        <body>
+            <div id="header">Minimum headcount: {minimum_headcount}</div>
+            {coverage_tables}
+        </body>
+        </html>
+        '''.format(
+            style = self.__get_style(), minimum_headcount = self.minimum_headcount,
+            coverage_tables = '<br/>'.join(coverage_tables)
+        )
+
+    def __get_coverage_table(self, week, timesheet):
+        """
+        Get the coverage table of the given facility sheet.
+        :param week: week number
+        :param timesheet: Timesheet object
+        :return: table
+        """
+        week_calendar = timesheet.get_week_calendar()
+        coverage_matrix = timesheet.coverage_matrix
+        max_headcount = max(int(coverage_matrix.max()) if coverage_matrix.size else 0, 1)
+        n_under_covered = int((coverage_matrix < self.minimum_headcount).sum())
+        day_headers = ''.join('''
+                    <th>{0}<br/>{1}</th>'''.format(day_name, wtc_date)
+            for day_name, wtc_date in zip(week_calendar.day_names, week_calendar.wtc_dates))
+        rows = []
+        for tci_str, headcounts in zip(timesheet.tci_str_list, coverage_matrix.tolist()):
+            cells = ''.join('''
+                    <td style="background-color: {0}">{1}</td>'''.format(self.__get_color(headcount, max_headcount), headcount)
+                for headcount in headcounts)
+            rows.append('''
+                <tr>
+                    <td class="time-increment">{0}</td>{1}
+                </tr>'''.format(tci_str, cells))
+        return '''
+            <table>
+                <tr>
+                    <th colspan="{n_columns}">Week {week}: {facility_name} ({n_under_covered} under covered slots)</th>
+                </tr>
+                <tr>
+                    <th>Hours</th>{day_headers}
+                </tr>{rows}
+            </table>'''.format(
+                n_columns = len(week_calendar.dates) + 1, week = week, facility_name = timesheet.entity_facility_name,
+                n_under_covered = n_under_covered, day_headers = day_headers, rows = ''.join(rows)
+            )
+
+    def __get_color(self, headcount, max_headcount):
+        """
+        Get the background color for the given headcount: red if under covered, otherwise a shade
+        of green scaled by the highest headcount of the sheet.
+        :param headcount: headcount
+        :param max_headcount: highest headcount of the sheet
+        :return: css color
+        """
+        if headcount < self.minimum_headcount:
+            return self.UNDER_COVERED_COLOR
+        ratio = headcount / max_headcount
+        return 'rgb({0}, {1}, {2})'.format(*(round(255 - (255 - value) * ratio) for value in self.COVERED_RGB))
+
+    @staticmethod
+    def __get_style():
+        return '''
+            <style>
+                body {
+                    font-family: Arial, sans-serif;
+                    font-size: 12px;
+                    width: 760px;
+                    margin: 0 auto;
+                }
+
+                #header {
+                    text-align: center;
+                    margin-bottom: 20px;
+                }
+
+                table {
+                    border-collapse: collapse;
+                    width: 100%;
+                }
+
+                th, td {
+                    border: 1px solid black;
+                    padding-top: 4px;
+                    padding-bottom: 4px;
+                    text-align: center;
+                }
+
+                .time-increment {
+                    text-align: left;
+                    padding-left: 10px;
+                    font-size: 11px;
+                }
+            </style>'''
+
+
+if __name__ == "__main__":
+    from timesheet import Timesheet
+
+    print('Start Testing CoverageReport...\n')
+
+    test_timesheet = Timesheet('resources/Schedule Example.xlsx')
+    test_coverage_report = CoverageReport(minimum_headcount=2)
+    for test_record in list(test_coverage_report.get_records([[test_timesheet]]))[:10]:
+        print(test_record)
+
+    print('\nEnd Testing CoverageReport\n')
@@ -1,67 +1,143 @@
 __author__ = "Cal Ochoa"
 __email__ = "CalOchoa@gmail.com"
 
+import bisect
+import math
 from datetime import datetime
 
 from time_card_increments import TimeCardIncrements
+from overtime_rules import OvertimeRuleSet
 
 
 class DailyTimeCard(object):
 
-    NORMAL_HOURS = 8
     DEFAULT_DATE_FORMAT = '%m/%d/%y'
     NO_HOURS_WORKED_STR = 'OFF'
 
     def __init__(self, daily_date_str, date_format=DEFAULT_DATE_FORMAT):
-        self.daily_date = datetime.strptime(daily_date_str, date_format).date()
-        self.in_out_hours_list = []
+        self.__init_daily_date(datetime.strptime(daily_date_str, date_format).date())
+
+    @classmethod
+    def from_date(cls, daily_date, wtc_date=None, wtc_day=None):
+        """
+        Create the DailyTimeCard object for an already parsed date (see WeekCalendar), without
+        parsing a date string.
+        :param daily_date: date
+        :param wtc_date: date displayed on the weekly time card (optional)
+        :param wtc_day: day displayed on the weekly time card (optional)
+        :return: DailyTimeCard object
+        """
+        dtc = cls.__new__(cls)
+        dtc.__init_daily_date(daily_date, wtc_date, wtc_day)
+        return dtc
+
+    def __init_daily_date(self, daily_date, wtc_date=None, wtc_day=None):
+        self.daily_date = daily_date
+        self.wtc_date = wtc_date or daily_date.strftime(self.DEFAULT_DATE_FORMAT)
+        self.wtc_day = wtc_day or daily_date.strftime('%A')
         self.total_daily_hours = 0
-        self.set_ot_hours = None      # this value is set when the weekly overtime is hit
+        self.set_ot_hours = None      # this value is set by the overtime evaluator
+        self.set_dt_hours = None      # this value is set by the overtime evaluator (included in the overtime)
+        # daily overtime threshold of the overtime evaluator (the default rule set's until it is set)
+        self.normal_hours = OvertimeRuleSet.DAILY_HOURS
+        self.overlap_list = []        # (existing, added) TimeCardIncrements pairs that overlapped
+        self.set_in_out_hours_list([])
+
+    def set_in_out_hours_list(self, in_out_hours_list):
+        """
+        Set the in/out hours list (sorted by start time) and rebuild the start and end minute
+        indices used to bisect it.
+        :param in_out_hours_list: list of TimeCardIncrements objects sorted by start time
+        """
+        self.in_out_hours_list = in_out_hours_list
+        self.start_minute_list = [tci.start_minute for tci in in_out_hours_list]
+        self.end_minute_list = [tci.end_minute for tci in in_out_hours_list]
 
     def add_in_out_hours(self, time_card_increments_str):
         """
-        Add the input time card increments string to the in/out hours list, but only retain consecutive
-        blocks of time.  Also, update the total daily hours each time.  Finally, return the hours added.
+        Add the input time card increments string to the in/out hours list, which is kept sorted
+        by start time and only retains consecutive blocks of time.  The blocks touching the new
+        increment are found by bisecting the start and end minute indices, so increments can
+        arrive in any order.  Overlapping blocks are coalesced (the overlapping hours are only
+        counted once) and recorded in the overlap list.  Also, update the total daily hours each
+        time.  Finally, return the hours added.
         :param time_card_increments_str: time card increments string
         :return: hours added
         """
-        current_tci = TimeCardIncrements(time_card_increments_str)
+        return self.add_time_card_increments(TimeCardIncrements(time_card_increments_str))
+
+    def add_time_card_increments(self, current_tci):
+        """
+        Add the input TimeCardIncrements object to the in/out hours list (see `add_in_out_hours`).
+        :param current_tci: TimeCardIncrements object
+        :return: hours added
+        """
+        start_minute, end_minute = current_tci.start_minute, current_tci.end_minute
+        # blocks in [lo, hi) end at or after the new start and start at or before the new end
+        lo = bisect.bisect_left(self.end_minute_list, start_minute)
+        hi = bisect.bisect_right(self.start_minute_list, end_minute, lo)
         hours_added = current_tci.time_diff
+        if lo < hi:
+            first_tci, last_tci = self.in_out_hours_list[lo], self.in_out_hours_list[hi - 1]
+            covered_minutes = 0
+            for tci in self.in_out_hours_list[lo:hi]:
+                covered_minutes += tci.end_minute - tci.start_minute
+                if tci.start_minute < end_minute and tci.end_minute > start_minute:
+                    self.overlap_list.append((tci, current_tci))
+            merged_start_str = first_tci.start_time_str if first_tci.start_minute < start_minute \
+                else current_tci.start_time_str
+            merged_end_str = last_tci.end_time_str if last_tci.end_minute > end_minute \
+                else current_tci.end_time_str
+            if self.overlap_list and self.overlap_list[-1][1] is current_tci:
+                # only count the minutes that were not already covered
+                merged_minutes = max(last_tci.end_minute, end_minute) - min(first_tci.start_minute, start_minute)
+                hours_added = (merged_minutes - covered_minutes) / 60
+            merged_start_minute = min(first_tci.start_minute, start_minute)
+            current_tci = TimeCardIncrements('{0}{1}{2}'.format(
+                merged_start_str, TimeCardIncrements.TIME_SEPARATOR, merged_end_str
+            ))
+            if merged_start_minute >= TimeCardIncrements.MINUTES_IN_DAY:
+                current_tci.add_day_offset()
+        self.in_out_hours_list[lo:hi] = [current_tci]
+        self.start_minute_list[lo:hi] = [current_tci.start_minute]
+        self.end_minute_list[lo:hi] = [current_tci.end_minute]
         self.total_daily_hours += hours_added
-        if self.in_out_hours_list:
-            last_tci = self.in_out_hours_list[-1]
-            if last_tci.end_time == current_tci.start_time:
-                self.in_out_hours_list.pop()
-                update_tci_str = '{0}{1}{2}'.format(
-                    last_tci.start_time_str, TimeCardIncrements.TIME_SEPARATOR, current_tci.end_time_str
-                )
-                current_tci = TimeCardIncrements(update_tci_str)
-        self.in_out_hours_list.append(current_tci)
         return hours_added
 
     def has_overtime_pay(self):
         """
-        Check if there is overtime pay for this daily time card by comparing the total 
-        daily hours to the normal hours.
+        Check if there is overtime pay for this daily time card.
         :return: boolean status
         """
-        return self.total_daily_hours > self.NORMAL_HOURS or self.set_ot_hours is not None
+        return self.get_overtime_hours() > 0
     
     def get_overtime_hours(self):
         """
-        Get the amount of overtime hours for the daily time card, if applicable.
+        Get the amount of overtime hours for the daily time card, if applicable.  The overtime
+        hours are set by the overtime evaluator of the WeeklyTimeCard object; until then, only
+        the daily threshold is checked.
         :return: overtime hours
         """
         overtime_hours = 0
-        if self.set_ot_hours:
+        if self.set_ot_hours is not None:
             overtime_hours = self.set_ot_hours
-        elif self.has_overtime_pay():
-            overtime_hours = self.total_daily_hours - self.NORMAL_HOURS
+        elif self.total_daily_hours > self.normal_hours:
+            overtime_hours = self.total_daily_hours - self.normal_hours
         return overtime_hours
-    
+
+    def get_double_time_hours(self):
+        """
+        Get the amount of double time hours for the daily time card (included in the overtime
+        hours), as set by the overtime evaluator.
+        :return: double time hours
+        """
+        return self.set_dt_hours or 0
+
     def get_daily_hours_worked_str(self):
         """
-        Get the daily hours worked string for the daily time card.
+        Get the daily hours worked string for the daily time card: the total hours, or the daily
+        threshold plus the overtime hours (ie `8 + 2`), followed by the double time hours if any
+        (ie `8 + 2 + 2 DT`).  If the daily threshold is disabled, the regular hours are used.
         :return: daily hours worked string
         """
         daily_hours_worked_str = self.NO_HOURS_WORKED_STR
@@ -69,7 +145,14 @@ class DailyTimeCard(object):
             daily_hours_worked_str = '{0}'.format(self.__get_valid_hours(self.total_daily_hours))
             overtime_hours = self.get_overtime_hours()
             if overtime_hours:
-                daily_hours_worked_str = '{0} + {1}'.format(self.NORMAL_HOURS, self.__get_valid_hours(overtime_hours))
+                double_time_hours = self.get_double_time_hours()
+                normal_hours = self.total_daily_hours - overtime_hours if math.isinf(self.normal_hours) \
+                    else self.normal_hours
+                daily_hours_worked_str = '{0} + {1}'.format(
+                    self.__get_valid_hours(normal_hours), self.__get_valid_hours(overtime_hours - double_time_hours)
+                )
+                if double_time_hours:
+                    daily_hours_worked_str += ' + {0} DT'.format(self.__get_valid_hours(double_time_hours))
         return daily_hours_worked_str
     
     @staticmethod
@@ -87,23 +170,27 @@ class DailyTimeCard(object):
         Get the date in the format for the weekly time card html file.
         :return: weekly time card date
         """
-        return self.daily_date.strftime(self.DEFAULT_DATE_FORMAT)
+        return self.wtc_date
 
     def get_wtc_day(self):
         """
         Get the day in the format for the weekly time card html file.
         :return: weekly time card day
         """
-        return self.daily_date.strftime('%A')
+        return self.wtc_day
 
     def display_contents(self):
         print('***** Daily Time Card *****')
-        print('Daily Date: {0} ({1})'.format(self.daily_date, self.daily_date.strftime('%A')))
+        print('Daily Date: {0} ({1})'.format(self.daily_date, self.wtc_day))
         print('Total Daily Hours: {0}'.format(self.total_daily_hours))
         print('Has Daily Overtime Pay: {0}'.format(self.has_overtime_pay()))
         print('Daily Overtime Hours: {0}'.format(self.get_overtime_hours()))
         print('Daily Set Overtime Hours: {0}'.format(self.set_ot_hours))
+        print('Daily Set Double Time Hours: {0}'.format(self.set_dt_hours))
         print('In Out Hours: {0}'.format([in_out_hour.get_start_end_time_str() for in_out_hour in self.in_out_hours_list]))
+        print('Overlapping Hours: {0}'.format([
+            (tci_1.get_start_end_time_str(), tci_2.get_start_end_time_str()) for tci_1, tci_2 in self.overlap_list
+        ]))
         print('Daily Hours Worked: {0}\n'.format(self.get_daily_hours_worked_str()))
 
 
@@ -123,6 +210,7 @@ if __name__ == "__main__":
     ]
     test_me('09/19/22', test_in_out_hours_list)
     test_me('09/22/22', ['3pm-7:30pm', '8pm-11:45pm'])
+    test_me('09/23/22', ['2pm-3pm', '10am-11am', '11am-12pm', '1pm-2pm', '12pm-1pm', '10:30am-11:30am'])
     test_me('09-24-22', ['6am-10:15am', '12pm-3:45pm', '1am-3am'], date_format='%m-%d-%y')
     test_me('092522', [], date_format='%m%d%y')
 
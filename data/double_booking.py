@@ -0,0 +1,136 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import heapq
+from datetime import datetime, timedelta
+
+
+class DoubleBooking(object):
+    """
+    Overlap between two shifts of the same employee scheduled at different facilities.  Each
+    shift is a tuple of (start minute, end minute, Timesheet object, cell range), where the
+    minutes are counted on the timeline of DoubleBookingDetector.
+    """
+
+    def __init__(self, employee_name, shift_1, shift_2):
+        self.employee_name = employee_name
+        self.shift_1 = shift_1
+        self.shift_2 = shift_2
+        self.start_minute = max(shift_1[0], shift_2[0])
+        self.end_minute = min(shift_1[1], shift_2[1])
+
+    def get_overlap_hours(self):
+        """
+        Get the hours scheduled at both facilities.
+        :return: overlap hours
+        """
+        return (self.end_minute - self.start_minute) / 60
+
+    @staticmethod
+    def __get_datetime_str(minute):
+        """
+        Get the date and time string for the given minute of the timeline.
+        :param minute: minute
+        :return: date and time string
+        """
+        day_ordinal, minute = divmod(minute, DoubleBookingDetector.MINUTES_IN_DAY)
+        return (datetime.fromordinal(day_ordinal) + timedelta(minutes=minute)).strftime('%m/%d/%y %I:%M%p')
+
+    @staticmethod
+    def __get_shift_ref(shift):
+        """
+        Get the facility, sheet, and cells of the given shift.
+        :param shift: shift tuple
+        :return: shift reference
+        """
+        timesheet, cell_range = shift[2], shift[3]
+        return '`{0}` (sheet `{1}`, {2})'.format(timesheet.entity_facility_name, timesheet.sheet_name, cell_range)
+
+    def __str__(self):
+        return 'Double booking: `{0}` at {1} and {2} from {3} to {4} ({5} hours)'.format(
+            self.employee_name, self.__get_shift_ref(self.shift_1), self.__get_shift_ref(self.shift_2),
+            self.__get_datetime_str(self.start_minute), self.__get_datetime_str(self.end_minute),
+            self.get_overlap_hours()
+        )
+
+    def __repr__(self):
+        return 'DoubleBooking[{0}]'.format(self)
+
+
+class DoubleBookingDetector(object):
+    """
+    Detect the employees scheduled at two facilities at overlapping times.  The shifts of every
+    facility sheet of the workbook are placed on a single timeline (minutes counted from the 1st
+    day of the proleptic Gregorian calendar, see `date.toordinal`), so overnight shifts and
+    consecutive weeks are handled alike.  A facility has a timesheet per week, so the shifts are
+    compared by facility name (not by timesheet).  The shifts are grouped by employee key, sorted
+    by start, and swept once while the shifts still in progress are kept in a heap per facility
+    ordered by end.  Only the heaps of the other facilities are walked, so the sweep is
+    O(n log n + n * f) over the total number of shifts n and facilities f (plus the overlaps
+    reported).
+    """
+
+    MINUTES_IN_DAY = 1440
+
+    def __init__(self, weekly_timesheets_list):
+        self.weekly_timesheets_list = weekly_timesheets_list
+
+    def __get_key_shifts_dict(self):
+        """
+        Get the dictionary of employee key to list of shifts, from the shift references of
+        every timesheet.
+        :return: dictionary of employee key -> (employee name, list of shift tuples)
+        """
+        key_shifts_dict = {}
+        for weekly_timesheets in self.weekly_timesheets_list:
+            for timesheet in weekly_timesheets:
+                for wtc, day_idx, start_minute, end_minute, cell_range in timesheet.shift_ref_list:
+                    day_minute = wtc.week_calendar.dates[day_idx].toordinal() * self.MINUTES_IN_DAY
+                    employee = wtc.employee
+                    key_shifts_dict.setdefault(employee.employee_key, (employee.employee_name, []))[1].append(
+                        (day_minute + start_minute, day_minute + end_minute, timesheet, cell_range)
+                    )
+        return key_shifts_dict
+
+    def get_double_bookings(self):
+        """
+        Get the overlaps between the shifts of the same employee at different facilities.
+        :return: list of DoubleBooking objects, in time order
+        """
+        double_bookings = []
+        for employee_name, shifts in self.__get_key_shifts_dict().values():
+            shifts.sort(key=lambda shift: shift[:2])
+            facility_in_progress_dict = {}  # facility name -> heap of (end minute, shift index)
+            for shift_idx, shift in enumerate(shifts):
+                facility_name = shift[2].entity_facility_name
+                for other_facility_name, in_progress in facility_in_progress_dict.items():
+                    while in_progress and in_progress[0][0] <= shift[0]:
+                        heapq.heappop(in_progress)
+                    if other_facility_name != facility_name:
+                        for _, other_idx in in_progress:
+                            double_bookings.append(DoubleBooking(employee_name, shifts[other_idx], shift))
+                heapq.heappush(facility_in_progress_dict.setdefault(facility_name, []), (shift[1], shift_idx))
+        double_bookings.sort(key=lambda double_booking: (double_booking.start_minute, double_booking.employee_name))
+        return double_bookings
+
+    def report(self):
+        """
+        Print a line for each double booking.
+        :return: list of DoubleBooking objects
+        """
+        double_bookings = self.get_double_bookings()
+        for double_booking in double_bookings:
+            print(double_booking)
+        return double_bookings
+
+
+if __name__ == "__main__":
+    from time_card_generator import TimeCardGenerator
+
+    print('Start Testing DoubleBookingDetector...\n')
+
+    # the generator reports the double bookings while loading the workbook
+    test_tc_generator = TimeCardGenerator('resources/Schedule Example #3.xlsx')
+    print('{0} double booking(s) found'.format(len(test_tc_generator.double_bookings)))
+
+    print('\nEnd Testing DoubleBookingDetector\n')
@@ -9,6 +9,7 @@ class Employee(object):
         self.employee_name = employee_name
         self.entity_name, self.facility_name = self.split_entity_facility_name(entity_facility_name)
         self.position = position
+        self.employee_key = None    # global key across the sheets of a workbook (see EmployeeIndex)
 
     # TODO: add comments
     def split_entity_facility_name(self, entity_facility_name):
@@ -0,0 +1,117 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import string
+import unicodedata
+
+
+class EmployeeIndex(object):
+    """
+    Index of the employees of a workbook across every sheet.  The employee ids are only unique
+    within a sheet, so each employee name is normalized (case, whitespace, and punctuation) and
+    mapped to a global integer key.  The index is built once per workbook: it sets the key of
+    every Employee object and the dictionary of key to WeeklyTimeCard object of every Timesheet
+    object, so the weeks and facilities are joined on the key instead of the raw name.  Two
+    employees of the same sheet whose names normalize to the same name (ie `Jane Doe` and
+    `jane  doe.` with different ids) are kept apart: the 2nd one is identified by its normalized
+    name and its sheet-local id, so neither time card (nor its hours) is dropped.
+    """
+
+    PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+    IDENTITY_WITH_ID = '{0} ({1})'  # normalized employee name (employee id)
+
+    def __init__(self, weekly_timesheets_list):
+        self.key_dict = {}          # identity (normalized employee name) -> key
+        self.employee_names = []    # key -> employee name (as first seen)
+        self.identities = []        # key -> identity
+        for weekly_timesheets in weekly_timesheets_list:
+            for timesheet in weekly_timesheets:
+                self.add_timesheet(timesheet)
+
+    @classmethod
+    def normalize_name(cls, employee_name):
+        """
+        Normalize the employee name, so `Jane Doe` and `jane  doe.` are the same employee.
+        :param employee_name: employee name
+        :return: normalized employee name
+        """
+        employee_name = unicodedata.normalize('NFKC', employee_name).translate(cls.PUNCTUATION_TABLE)
+        return ' '.join(employee_name.casefold().split())
+
+    def get_key(self, employee_name):
+        """
+        Get the key for the given employee name, adding the employee if necessary.
+        :param employee_name: employee name
+        :return: key
+        """
+        return self.__get_identity_key(self.normalize_name(employee_name), employee_name)
+
+    def __get_identity_key(self, identity, employee_name):
+        """
+        Get the key for the given identity, adding the employee if necessary.
+        :param identity: normalized employee name (with the employee id on a collision)
+        :param employee_name: employee name
+        :return: key
+        """
+        key = self.key_dict.get(identity)
+        if key is None:
+            key = len(self.employee_names)
+            self.key_dict[identity] = key
+            self.employee_names.append(employee_name)
+            self.identities.append(identity)
+        return key
+
+    def add_timesheet(self, timesheet):
+        """
+        Set the key of every employee of the given timesheet, and the timesheet's dictionary of
+        key to WeeklyTimeCard object.  An employee whose normalized name is already taken on the
+        timesheet is keyed by its normalized name and its employee id instead (with a warning).
+        :param timesheet: Timesheet object
+        """
+        key_wtc_dict = {}
+        for wtc in timesheet.id_wtc_dict.values():
+            employee = wtc.employee
+            employee.employee_key = self.get_key(employee.employee_name)
+            if employee.employee_key in key_wtc_dict:
+                other_employee = key_wtc_dict[employee.employee_key].employee
+                print('Employees `{0}` (ID: {1}) and `{2}` (ID: {3}) of `{4}` for the week of {5} have the same '
+                      'normalized name, keeping them apart by ID'.format(
+                          other_employee.employee_name, other_employee.employee_id, employee.employee_name,
+                          employee.employee_id, timesheet.entity_facility_name, timesheet.weekly_date_str
+                      ))
+                employee.employee_key = self.__get_identity_key(
+                    self.IDENTITY_WITH_ID.format(self.normalize_name(employee.employee_name), employee.employee_id),
+                    employee.employee_name
+                )
+            key_wtc_dict[employee.employee_key] = wtc
+        timesheet.key_wtc_dict = key_wtc_dict
+
+    def get_employee_name(self, key):
+        """
+        Get the employee name (as first seen) for the given key.
+        :param key: key
+        :return: employee name
+        """
+        return self.employee_names[key]
+
+    def get_identity(self, key):
+        """
+        Get the identity (the normalized employee name, with the employee id on a collision) for
+        the given key, which identifies the employee across workbooks (see HistoryStore).
+        :param key: key
+        :return: identity
+        """
+        return self.identities[key]
+
+    def __len__(self):
+        return len(self.employee_names)
+
+
+if __name__ == "__main__":
+    print('Start Testing EmployeeIndex...\n')
+
+    test_employee_index = EmployeeIndex([])
+    for test_employee_name in ['Jane Doe', 'Jane  Doe.', 'jane doe', 'Sam Poe']:
+        print('{0} -> {1}'.format(test_employee_name, test_employee_index.get_key(test_employee_name)))
+
+    print('\nEnd Testing EmployeeIndex\n')
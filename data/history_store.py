@@ -0,0 +1,216 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import argparse
+import os
+import sqlite3
+from datetime import date, datetime
+
+from employee_index import EmployeeIndex
+
+
+class HistoryStore(object):
+    """
+    Local SQLite store of the computed runs, so the hours of many pay periods can be queried
+    (year to date hours, overtime trends, weeks over 40 hours across every facility) without
+    reprocessing the historical workbooks.  Each run appends its weekly hours (one row per
+    employee per facility per week) and its shifts.  A facility week that is stored again (ie
+    a corrected workbook) replaces the previous rows, so runs can be appended incrementally.
+    Employees are identified by their normalized name (see EmployeeIndex), as the employee ids
+    are only unique within a sheet; two employees of a sheet with the same normalized name are
+    told apart by their employee id (see `EmployeeIndex.get_identity`).
+    """
+
+    DEFAULT_DB_FILE_PATH = 'output/history.sqlite'
+    NORMAL_WEEKLY_HOURS = 40
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id INTEGER PRIMARY KEY,
+            source TEXT,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS weekly_hours (
+            run_id INTEGER NOT NULL REFERENCES runs (run_id),
+            employee TEXT NOT NULL,
+            employee_name TEXT NOT NULL,
+            employee_id TEXT,
+            entity_name TEXT NOT NULL,
+            facility_name TEXT NOT NULL,
+            week_start TEXT NOT NULL,
+            regular_hours REAL NOT NULL,
+            overtime_hours REAL NOT NULL,
+            double_time_hours REAL NOT NULL,
+            total_hours REAL NOT NULL,
+            PRIMARY KEY (employee, entity_name, facility_name, week_start)
+        );
+        CREATE INDEX IF NOT EXISTS weekly_hours_facility_idx ON weekly_hours (entity_name, facility_name, week_start);
+        CREATE INDEX IF NOT EXISTS weekly_hours_week_idx ON weekly_hours (week_start);
+        CREATE TABLE IF NOT EXISTS shifts (
+            run_id INTEGER NOT NULL REFERENCES runs (run_id),
+            employee TEXT NOT NULL,
+            entity_name TEXT NOT NULL,
+            facility_name TEXT NOT NULL,
+            week_start TEXT NOT NULL,
+            shift_date TEXT NOT NULL,
+            start_minute INTEGER NOT NULL,
+            end_minute INTEGER NOT NULL,
+            hours REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS shifts_employee_idx ON shifts (employee, shift_date);
+        CREATE INDEX IF NOT EXISTS shifts_facility_idx ON shifts (entity_name, facility_name, week_start);
+    '''
+
+    def __init__(self, db_file_path=DEFAULT_DB_FILE_PATH):
+        db_dir = os.path.dirname(db_file_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self.db_file_path = db_file_path
+        self.connection = sqlite3.connect(db_file_path)
+        self.connection.executescript(self.SCHEMA)
+
+    def append_run(self, weekly_timesheets_list, employee_index, source=None):
+        """
+        Append the computed hours of a run in a single transaction.  The facility weeks of the
+        run replace any previously stored rows for the same facility and week.
+        :param weekly_timesheets_list: list of lists of Timesheet objects, one list per week
+        :param employee_index: EmployeeIndex object of the run
+        :param source: source of the run (ie the excel file name)
+        :return: run id
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                'INSERT INTO runs (source, created_at) VALUES (?, ?)',
+                (source, datetime.now().isoformat(timespec='seconds'))
+            )
+            run_id = cursor.lastrowid
+            for weekly_timesheets in weekly_timesheets_list:
+                for timesheet in weekly_timesheets:
+                    self.__append_timesheet(run_id, timesheet, employee_index)
+        return run_id
+
+    def __append_timesheet(self, run_id, timesheet, employee_index):
+        """
+        Replace the stored rows of the given facility timesheet with its weekly hours and shifts.
+        :param run_id: run id
+        :param timesheet: Timesheet object
+        :param employee_index: EmployeeIndex object of the run
+        """
+        weekly_hours_rows = []
+        shift_rows = []
+        facility_weeks = set()
+        for wtc in timesheet.id_wtc_dict.values():
+            employee = wtc.employee
+            employee_key = employee_index.get_identity(employee.employee_key)
+            week_start = wtc.daily_time_card_list[0].daily_date.isoformat()
+            facility_weeks.add((employee.entity_name, employee.facility_name, week_start))
+            weekly_hours_rows.append((
+                run_id, employee_key, employee.employee_name, employee.employee_id, employee.entity_name,
+                employee.facility_name, week_start, wtc.get_regular_hours(), wtc.get_overtime_hours(),
+                wtc.get_double_time_hours(), wtc.total_weekly_hours
+            ))
+            for dtc in wtc.daily_time_card_list:
+                shift_date = dtc.daily_date.isoformat()
+                for tci in dtc.in_out_hours_list:
+                    shift_rows.append((
+                        run_id, employee_key, employee.entity_name, employee.facility_name, week_start,
+                        shift_date, tci.start_minute, tci.end_minute, tci.time_diff
+                    ))
+        for facility_week in facility_weeks:
+            for table in ['weekly_hours', 'shifts']:
+                self.connection.execute(
+                    'DELETE FROM {0} WHERE entity_name = ? AND facility_name = ? AND week_start = ?'.format(table),
+                    facility_week
+                )
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO weekly_hours VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', weekly_hours_rows
+        )
+        self.connection.executemany('INSERT INTO shifts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', shift_rows)
+
+    def get_year_to_date_hours(self, year, through_date=None, employee_name=None):
+        """
+        Get the regular, overtime, and total hours of each employee (across every facility) for
+        the weeks starting in the given year, up to the given date.
+        :param year: year
+        :param through_date: last date (defaults to the end of the year)
+        :param employee_name: only this employee (optional)
+        :return: list of (employee name, regular hours, overtime hours, total hours)
+        """
+        through_date = through_date or date(year, 12, 31)
+        query = '''
+            SELECT MIN(employee_name), SUM(regular_hours), SUM(overtime_hours), SUM(total_hours)
+            FROM weekly_hours WHERE week_start BETWEEN ? AND ?{0}
+            GROUP BY employee ORDER BY MIN(employee_name)
+        '''
+        params = [date(year, 1, 1).isoformat(), through_date.isoformat()]
+        return self.__query(query, params, employee_name)
+
+    def get_overtime_trend(self, employee_name, n_weeks=8):
+        """
+        Get the trailing weekly overtime hours (across every facility) of the given employee.
+        :param employee_name: employee name
+        :param n_weeks: number of trailing weeks
+        :return: list of (week start, overtime hours, total hours), oldest week first
+        """
+        rows = self.connection.execute('''
+            SELECT week_start, SUM(overtime_hours), SUM(total_hours)
+            FROM weekly_hours WHERE employee = ?
+            GROUP BY week_start ORDER BY week_start DESC LIMIT ?
+        ''', (EmployeeIndex.normalize_name(employee_name), n_weeks)).fetchall()
+        return rows[::-1]
+
+    def get_weeks_over_hours(self, hours=NORMAL_WEEKLY_HOURS, employee_name=None):
+        """
+        Get the weeks where an employee worked more than the given hours across every facility.
+        :param hours: weekly hours
+        :param employee_name: only this employee (optional)
+        :return: list of (employee name, week start, total hours, number of facilities)
+        """
+        query = '''
+            SELECT MIN(employee_name), week_start, SUM(total_hours), COUNT(*)
+            FROM weekly_hours WHERE 1 = 1{0}
+            GROUP BY employee, week_start HAVING SUM(total_hours) > ?
+            ORDER BY week_start, MIN(employee_name)
+        '''
+        return self.__query(query, [], employee_name, [hours])
+
+    def __query(self, query, params, employee_name, having_params=None):
+        """
+        Run the given query, optionally filtered by employee (the `{0}` of the query).
+        :param query: query with a `{0}` placeholder for the employee filter
+        :param params: query parameters
+        :param employee_name: employee name (optional)
+        :param having_params: query parameters after the employee filter
+        :return: list of rows
+        """
+        employee_filter = ''
+        if employee_name:
+            employee_filter = ' AND employee = ?'
+            params = params + [EmployeeIndex.normalize_name(employee_name)]
+        return self.connection.execute(query.format(employee_filter), params + (having_params or [])).fetchall()
+
+    def close(self):
+        self.connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Query the history of the computed time card runs.')
+    parser.add_argument('db_file_path', nargs='?', default=HistoryStore.DEFAULT_DB_FILE_PATH)
+    parser.add_argument('--year', type=int, default=date.today().year, help='year of the year to date hours')
+    parser.add_argument('--employee', help='only this employee (the overtime trend requires it)')
+    parser.add_argument('--weeks', type=int, default=8, help='number of trailing weeks of the overtime trend')
+    parser.add_argument('--over-hours', type=float, default=HistoryStore.NORMAL_WEEKLY_HOURS)
+    args = parser.parse_args()
+
+    history_store = HistoryStore(args.db_file_path)
+    print('Year to date hours ({0}):'.format(args.year))
+    for row in history_store.get_year_to_date_hours(args.year, employee_name=args.employee):
+        print('    {0}: regular {1}, overtime {2}, total {3}'.format(*row))
+    if args.employee:
+        print('Overtime trend ({0}):'.format(args.employee))
+        for row in history_store.get_overtime_trend(args.employee, n_weeks=args.weeks):
+            print('    {0}: overtime {1}, total {2}'.format(*row))
+    print('Weeks over {0} hours:'.format(args.over_hours))
+    for row in history_store.get_weeks_over_hours(args.over_hours, employee_name=args.employee):
+        print('    {0} ({1}): {2} hours at {3} facilities'.format(*row))
+    history_store.close()
@@ -0,0 +1,113 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import csv
+import json
+
+from employee import Employee
+from weekly_time_card import WeeklyTimeCard
+
+
+class HoursExport(object):
+    """
+    Export the computed pay period hours as machine readable records (one record per employee
+    per facility per week) for downstream payroll systems.  The records are streamed straight
+    to the file as NDJSON or CSV, without building the html summary.
+    """
+
+    CSV = 'csv'
+    NDJSON = 'ndjson'
+    FILE_FORMATS = [CSV, NDJSON]
+
+    FIELD_NAMES = [
+        'employee_name', 'employee_id', 'entity_name', 'facility_name', 'week', 'week_of',
+        'regular_hours', 'overtime_hours', 'double_time_hours', 'total_hours'
+    ]
+
+    def __init__(self, file_format=CSV):
+        if file_format not in self.FILE_FORMATS:
+            raise Exception('file format must be one of {0}'.format(self.FILE_FORMATS))
+        self.file_format = file_format
+
+    def get_records(self, employee_keys, weekly_timesheets_list):
+        """
+        Get the records for each employee (in pay period order), for each week, and for each
+        facility the employee worked at that week.  The facility hours come from the facility
+        timesheet, which already accounts for overtime earned across multiple facilities.
+        :param employee_keys: iterable of employee keys (see EmployeeIndex) in pay period order
+        :param weekly_timesheets_list: list of lists of Timesheet objects, one list per week
+        :return: generator of records (dict)
+        """
+        for employee_key in employee_keys:
+            for week_idx, weekly_timesheets in enumerate(weekly_timesheets_list):
+                for timesheet in weekly_timesheets:
+                    wtc = timesheet.key_wtc_dict.get(employee_key)
+                    if wtc:
+                        yield self.get_record(wtc, week_idx + 1)
+
+    def get_record(self, wtc, week):
+        """
+        Get the record for the given WeeklyTimeCard object and week number.
+        :param wtc: WeeklyTimeCard object
+        :param week: week number
+        :return: record (dict)
+        """
+        employee = wtc.employee
+        regular_hours = self.__remove_decimal_if_whole(wtc.get_regular_hours())
+        overtime_hours = self.__remove_decimal_if_whole(wtc.get_overtime_hours())
+        return {
+            'employee_name': employee.employee_name,
+            'employee_id': employee.employee_id,
+            'entity_name': employee.entity_name,
+            'facility_name': employee.facility_name,
+            'week': week,
+            'week_of': wtc.weekly_date_str,
+            'regular_hours': regular_hours,
+            'overtime_hours': overtime_hours,
+            'double_time_hours': self.__remove_decimal_if_whole(wtc.get_double_time_hours()),
+            'total_hours': self.__remove_decimal_if_whole(regular_hours + overtime_hours),
+        }
+
+    def write(self, file_path, records):
+        """
+        Stream the records to the given file path using the export file format.
+        :param file_path: file path
+        :param records: iterable of records (dict)
+        :return: number of records written
+        """
+        count = 0
+        with open(file_path, 'w', newline='') as file:
+            if self.file_format == self.CSV:
+                writer = csv.DictWriter(file, fieldnames=self.FIELD_NAMES)
+                writer.writeheader()
+                for record in records:
+                    writer.writerow(record)
+                    count += 1
+            else:
+                for record in records:
+                    file.write(json.dumps(record))
+                    file.write('\n')
+                    count += 1
+        print(f"Export file '{file_path}' has been created with {count} records.")
+        return count
+
+    @staticmethod
+    def __remove_decimal_if_whole(input_num):
+        """
+        Remove the decimal if the input number is a whole number.
+        :param input_num: input number
+        :return: number
+        """
+        return int(input_num) if isinstance(input_num, float) and input_num.is_integer() else input_num
+
+
+if __name__ == "__main__":
+    print('Start Testing HoursExport...\n')
+
+    test_wtc = WeeklyTimeCard('052923-060423', Employee('A', 'Cal Ochoa', 'Cal Workouts dba Taconic'))
+    for test_day_idx in range(6):
+        test_wtc.add_time_inc(test_day_idx, '8am-5pm')
+    test_hours_export = HoursExport(file_format=HoursExport.NDJSON)
+    print(test_hours_export.get_record(test_wtc, 1))
+
+    print('\nEnd Testing HoursExport\n')
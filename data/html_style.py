@@ -0,0 +1,96 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import re
+import textwrap
+
+
+class HtmlStyle(object):
+    """
+    How the stylesheet of the html files is written:
+        - `inline`: every file embeds its stylesheet and keeps the indented markup, so each file
+          can be used on its own (default)
+        - `shared`: every file links to a single shared `style.css` and its markup is whitespace
+          minified, so the thousands of time cards of a run do not each repeat the same stylesheet
+    """
+
+    INLINE = 'inline'
+    SHARED = 'shared'
+    MODES = [INLINE, SHARED]
+
+    STYLESHEET_FILE_NAME = 'style.css'
+
+    STYLE_TAG_PATTERN = re.compile(r'</?style>')
+    WHITESPACE_PATTERN = re.compile(r'\s+')
+    BETWEEN_TAGS_PATTERN = re.compile(r'>\s+<')
+
+    @staticmethod
+    def get_stylesheet_link(stylesheet_href):
+        """
+        Get the link to the shared stylesheet, in place of the inline stylesheet of a template.
+        :param stylesheet_href: path of the shared stylesheet, relative to the html file
+        :return: link tag
+        """
+        return '''
+            <link rel="stylesheet" href="{0}">'''.format(stylesheet_href)
+
+    @classmethod
+    def get_stylesheet(cls, styles):
+        """
+        Get the content of the shared stylesheet from the inline stylesheets (`<style>` tags) of
+        the templates.  The rules repeated across the templates are only kept once.
+        :param styles: list of inline stylesheets
+        :return: css content
+        """
+        rules = []
+        for style in styles:
+            for rule in cls.__get_rules(cls.STYLE_TAG_PATTERN.sub('', style)):
+                if rule not in rules:
+                    rules.append(rule)
+        return '\n\n'.join(rules) + '\n'
+
+    @staticmethod
+    def __get_rules(css):
+        """
+        Split the css into its top level rules (ie a `@media` rule is kept with its nested rules).
+        :param css: css content
+        :return: list of rules, dedented
+        """
+        rules = []
+        depth = 0
+        start_idx = 0
+        for idx, char in enumerate(css):
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    rules.append(textwrap.dedent(css[start_idx:idx + 1]).strip())
+                    start_idx = idx + 1
+        return rules
+
+    @classmethod
+    def minify(cls, html_content):
+        """
+        Minify the whitespace of the html content: every run of whitespace is collapsed into a
+        single space (as the browser renders it) and the whitespace between tags is removed.
+        :param html_content: html content
+        :return: minified html content
+        """
+        return cls.BETWEEN_TAGS_PATTERN.sub('><', cls.WHITESPACE_PATTERN.sub(' ', html_content)).strip()
+
+
+if __name__ == "__main__":
+    from summary_template import SummaryTemplate
+    from wtc_template import WeeklyTimeCardTemplate
+
+    print('Start Testing HtmlStyle...\n')
+
+    print(HtmlStyle.get_stylesheet(SummaryTemplate().get_styles() + WeeklyTimeCardTemplate().get_styles()))
+    print(HtmlStyle.minify('''
+        <tr>
+            <td class="column1">Monday</td>
+            <td><b>From:</b> 01/01/24</td>
+        </tr>'''))
+
+    print('\nEnd Testing HtmlStyle\n')
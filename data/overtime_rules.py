@@ -0,0 +1,196 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+
+class OvertimeRuleSet(object):
+    """
+    Set of overtime rules applied to every weekly time card of a run:
+        - daily threshold: hours worked past the daily threshold are overtime
+        - weekly threshold: hours worked past the weekly threshold are overtime
+        - double time: hours worked past the double time threshold in a day are double time
+        - seventh consecutive day: every hour worked on the 7th consecutive day of the week is
+          overtime, and the hours past the daily threshold are double time
+    A rule is disabled by setting its threshold to None (or `seventh_day` to False).  The rule
+    set is compiled once per run into an OvertimeEvaluator object (see `compile`).
+    """
+
+    DEFAULT = 'default'
+    CALIFORNIA = 'california'
+    NAMES = [DEFAULT, CALIFORNIA]
+
+    DAILY_HOURS = 8
+    WEEKLY_HOURS = 40
+    DOUBLE_TIME_HOURS = 12
+
+    def __init__(self, daily_hours=DAILY_HOURS, weekly_hours=WEEKLY_HOURS, double_time_hours=None, seventh_day=False):
+        self.daily_hours = daily_hours
+        self.weekly_hours = weekly_hours
+        self.double_time_hours = double_time_hours
+        self.seventh_day = seventh_day
+
+    @classmethod
+    def from_name(cls, name):
+        """
+        Get the predefined rule set for the given name.
+        :param name: rule set name
+        :return: OvertimeRuleSet object
+        """
+        if name == cls.DEFAULT:
+            return cls()
+        if name == cls.CALIFORNIA:
+            return cls(double_time_hours=cls.DOUBLE_TIME_HOURS, seventh_day=True)
+        raise Exception('overtime rule set must be one of {0}'.format(cls.NAMES))
+
+    def compile(self):
+        """
+        Compile the rule set into an OvertimeEvaluator object.
+        :return: OvertimeEvaluator object
+        """
+        return OvertimeEvaluator(self)
+
+    def __repr__(self):
+        return ('OvertimeRuleSet[Daily Hrs: {0}, Weekly Hrs: {1}, Double Time Hrs: {2}, '
+                'Seventh Day: {3}]'.format(self.daily_hours, self.weekly_hours, self.double_time_hours, self.seventh_day))
+
+
+class OvertimeEvaluator(object):
+    """
+    Overtime rule set compiled into the thresholds of a single kernel.  The thresholds are
+    resolved once (a disabled rule gets an infinite threshold), so evaluating a shift is the
+    same few comparisons whatever rules are enabled.  The same evaluator is used for employees
+    working at a single facility and at multiple facilities.
+    """
+
+    DAYS_IN_WEEK = 7
+    DISABLED = float('inf')
+
+    def __init__(self, rule_set):
+        self.rule_set = rule_set
+        self.daily_hours = self.__get_threshold(rule_set.daily_hours)
+        self.weekly_hours = self.__get_threshold(rule_set.weekly_hours)
+        self.double_time_hours = self.__get_threshold(rule_set.double_time_hours)
+        self.seventh_day_idx = self.DAYS_IN_WEEK - 1 if rule_set.seventh_day else None
+        # hours past the daily threshold on the 7th consecutive day are double time
+        self.seventh_day_double_time_hours = self.daily_hours if rule_set.daily_hours is not None \
+            else self.DISABLED
+
+    @classmethod
+    def __get_threshold(cls, hours):
+        return cls.DISABLED if hours is None else hours
+
+    @staticmethod
+    def get_excess_hours(current_hours, shift_hours, threshold):
+        """
+        Get the hours of the shift that exceed the threshold, given the hours already worked.
+        :param current_hours: hours already worked
+        :param shift_hours: shift hours
+        :param threshold: threshold hours
+        :return: excess hours
+        """
+        if current_hours > threshold:
+            return shift_hours
+        return max(current_hours + shift_hours - threshold, 0)
+
+    def get_shift_hours(self, weekly_hours, daily_hours, shift_hours, seventh_day=False):
+        """
+        Get the overtime and double time hours of a shift, given the hours already worked that
+        week and that day.  The double time hours are included in the overtime hours.
+        :param weekly_hours: hours already worked that week
+        :param daily_hours: hours already worked that day
+        :param shift_hours: shift hours
+        :param seventh_day: True if the shift is on the 7th consecutive day worked
+        :return: overtime hours, double time hours
+        """
+        if seventh_day:
+            return shift_hours, self.get_excess_hours(daily_hours, shift_hours, self.seventh_day_double_time_hours)
+        double_time_hours = self.get_excess_hours(daily_hours, shift_hours, self.double_time_hours)
+        # use the maximum of the rules to avoid counting the same hours twice
+        overtime_hours = max(
+            self.get_excess_hours(weekly_hours, shift_hours, self.weekly_hours),
+            self.get_excess_hours(daily_hours, shift_hours, self.daily_hours),
+            double_time_hours
+        )
+        return overtime_hours, double_time_hours
+
+    def evaluate(self, weekly_time_cards):
+        """
+        Calculate the overtime hours of an employee's week, given the WeeklyTimeCard object of
+        each facility the employee worked at that week.  On the days with overtime, the shifts of
+        every facility are walked in time order, so each overtime hour is attributed to the
+        facility where it was worked.  The overtime hours, double time hours, and daily threshold
+        of every DailyTimeCard object and the double time hours of every WeeklyTimeCard object are
+        set along the way.
+        :param weekly_time_cards: list of WeeklyTimeCard objects of the same week
+        :return: list of overtime hours, one per WeeklyTimeCard object
+        """
+        overtime_hours_list = [0] * len(weekly_time_cards)
+        double_time_hours_list = [0] * len(weekly_time_cards)
+        weekly_hours = 0
+        days_worked = 0
+        daily_time_card_lists = zip(*[wtc.daily_time_card_list for wtc in weekly_time_cards])
+        for day_idx, daily_time_cards in enumerate(daily_time_card_lists):
+            total_daily_hours = sum(dtc.total_daily_hours for dtc in daily_time_cards)
+            seventh_day = day_idx == self.seventh_day_idx and days_worked == day_idx
+            if total_daily_hours:
+                days_worked += 1
+            overtime_hours, double_time_hours = self.get_shift_hours(weekly_hours, 0, total_daily_hours, seventh_day)
+            for dtc in daily_time_cards:
+                dtc.normal_hours = self.daily_hours
+            if len(daily_time_cards) == 1 or not overtime_hours:
+                # the whole day is a single step, there is nothing to attribute
+                for dtc in daily_time_cards:
+                    dtc.set_ot_hours = overtime_hours if dtc.total_daily_hours else 0
+                    dtc.set_dt_hours = double_time_hours if dtc.total_daily_hours else 0
+                overtime_hours_list[0] += overtime_hours
+                double_time_hours_list[0] += double_time_hours
+                weekly_hours += total_daily_hours
+                continue
+            daily_hours = 0
+            daily_overtime_hours_list = [0] * len(daily_time_cards)
+            daily_double_time_hours_list = [0] * len(daily_time_cards)
+            for shift_hours, card_idx in self.__get_daily_shifts(daily_time_cards):
+                overtime_hours, double_time_hours = self.get_shift_hours(
+                    weekly_hours, daily_hours, shift_hours, seventh_day
+                )
+                daily_overtime_hours_list[card_idx] += overtime_hours
+                daily_double_time_hours_list[card_idx] += double_time_hours
+                weekly_hours += shift_hours
+                daily_hours += shift_hours
+            for card_idx, dtc in enumerate(daily_time_cards):
+                dtc.set_ot_hours = daily_overtime_hours_list[card_idx]
+                dtc.set_dt_hours = daily_double_time_hours_list[card_idx]
+                overtime_hours_list[card_idx] += daily_overtime_hours_list[card_idx]
+                double_time_hours_list[card_idx] += daily_double_time_hours_list[card_idx]
+        for wtc, double_time_hours in zip(weekly_time_cards, double_time_hours_list):
+            wtc.double_time_hours = double_time_hours
+        return overtime_hours_list
+
+    @staticmethod
+    def __get_daily_shifts(daily_time_cards):
+        """
+        Get the shifts of the given daily time cards (one per facility) in time order.  On a
+        tie, the shift of the later facility comes first.
+        :param daily_time_cards: list of DailyTimeCard objects of the same day
+        :return: list of (shift hours, card index)
+        """
+        shifts = sorted(
+            (tci.start_minute, -card_idx, tci.time_diff)
+            for card_idx, dtc in enumerate(daily_time_cards) for tci in dtc.in_out_hours_list
+        )
+        return [(time_diff, -neg_card_idx) for start_minute, neg_card_idx, time_diff in shifts]
+
+
+if __name__ == "__main__":
+    print('Start Testing OvertimeRuleSet...\n')
+
+    for test_name in OvertimeRuleSet.NAMES:
+        test_evaluator = OvertimeRuleSet.from_name(test_name).compile()
+        print(test_evaluator.rule_set)
+        # 7 days of 13 hours worked
+        test_weekly_hours = 0
+        for test_day_idx in range(7):
+            test_seventh_day = test_day_idx == test_evaluator.seventh_day_idx
+            print(test_evaluator.get_shift_hours(test_weekly_hours, 0, 13, seventh_day=test_seventh_day))
+            test_weekly_hours += 13
+
+    print('\nEnd Testing OvertimeRuleSet\n')
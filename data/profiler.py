@@ -0,0 +1,57 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import cProfile
+import os
+import pstats
+
+
+class Profiler(object):
+    """
+    Wrap a function call in cProfile, dump the raw stats to a `.prof` file (readable by
+    snakeviz, flameprof, etc.), and print a table of the top N hot functions.
+    """
+
+    DEFAULT_TOP_N = 25
+    DEFAULT_SORT_KEY = 'cumulative'
+
+    def __init__(self, prof_file_path, top_n=DEFAULT_TOP_N, sort_key=DEFAULT_SORT_KEY):
+        self.prof_file_path = prof_file_path
+        self.top_n = top_n
+        self.sort_key = sort_key
+        self.profile = cProfile.Profile()
+
+    def run(self, func, *args, **kwargs):
+        """
+        Run the given function with the given arguments under the profiler, and return its result.
+        Profiling accumulates across calls, so multiple stages can be profiled into one file.
+        :param func: function to profile
+        :return: result of the function
+        """
+        self.profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.profile.disable()
+
+    def dump_stats(self):
+        """
+        Write the raw stats to the `.prof` file and print the top N hot functions.
+        """
+        prof_dir = os.path.dirname(self.prof_file_path)
+        if prof_dir and not os.path.exists(prof_dir):
+            os.makedirs(prof_dir)
+        self.profile.dump_stats(self.prof_file_path)
+        print(f"Profile file '{self.prof_file_path}' has been created.\n")
+        stats = pstats.Stats(self.profile)
+        stats.strip_dirs().sort_stats(self.sort_key).print_stats(self.top_n)
+
+
+if __name__ == "__main__":
+    print('Start Testing Profiler...\n')
+
+    test_profiler = Profiler('output/test/profiler_test.prof', top_n=5)
+    test_profiler.run(sorted, [3, 1, 2] * 1000)
+    test_profiler.dump_stats()
+
+    print('\nEnd Testing Profiler\n')
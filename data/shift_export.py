@@ -0,0 +1,137 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:     # optional dependency, only needed for the shift export
+    pa = None
+    pq = None
+
+
+class ShiftExport(object):
+    """
+    Export every TimeCardIncrements object of every DailyTimeCard as a row of a columnar
+    Parquet or Arrow IPC file, so many pay periods can be queried with memory mapped reads.
+    The rows are written in record batches and a full data frame is never materialized.
+    Requires the optional `pyarrow` dependency.
+    """
+
+    PARQUET = 'parquet'
+    ARROW = 'arrow'
+    FILE_FORMATS = [PARQUET, ARROW]
+    BATCH_SIZE = 4096
+
+    FIELDS = [
+        ('employee_id', 'string'),
+        ('employee_name', 'string'),
+        ('entity_name', 'string'),
+        ('facility_name', 'string'),
+        ('week', 'int8'),
+        ('date', 'date32'),
+        ('start', 'string'),
+        ('end', 'string'),
+        ('start_minute', 'int16'),
+        ('end_minute', 'int16'),
+        ('minutes', 'int32'),
+        ('regular_hours', 'float64'),
+        ('overtime_hours', 'float64'),
+    ]
+
+    def __init__(self, file_format=PARQUET, batch_size=BATCH_SIZE):
+        if pa is None:
+            raise Exception('the shift export requires `pyarrow` (pip install pyarrow)')
+        if file_format not in self.FILE_FORMATS:
+            raise Exception('file format must be one of {0}'.format(self.FILE_FORMATS))
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in self.FIELDS])
+
+    def get_rows(self, weekly_timesheets_list):
+        """
+        Get a row for every TimeCardIncrements object, for each week, facility timesheet, and
+        employee.  The facility timesheets are used so each shift keeps its facility.
+        :param weekly_timesheets_list: list of lists of Timesheet objects, one list per week
+        :return: generator of rows (tuple in `FIELDS` order)
+        """
+        for week_idx, weekly_timesheets in enumerate(weekly_timesheets_list):
+            for timesheet in weekly_timesheets:
+                for wtc in timesheet.id_wtc_dict.values():
+                    yield from self.get_wtc_rows(wtc, week_idx + 1)
+
+    def get_wtc_rows(self, wtc, week):
+        """
+        Get the rows for the given WeeklyTimeCard object.  The overtime hours of each day are
+        attributed to the last hours worked that day.  If the employee works at multiple
+        facilities, the daily overtime hours are already those worked at this facility.
+        :param wtc: WeeklyTimeCard object
+        :param week: week number
+        :return: list of rows
+        """
+        employee = wtc.employee
+        wtc.get_overtime_hours()
+        shift_list = []
+        for dtc in wtc.daily_time_card_list:
+            regular_hours_left = dtc.total_daily_hours - dtc.get_overtime_hours()
+            for tci in dtc.in_out_hours_list:
+                regular_hours = min(tci.time_diff, max(regular_hours_left, 0))
+                regular_hours_left -= regular_hours
+                shift_list.append([dtc.daily_date, tci, regular_hours, tci.time_diff - regular_hours])
+        rows = []
+        for daily_date, tci, regular_hours, overtime_hours in shift_list:
+            start_minute = self.get_minute_of_day(tci.start_time)
+            end_minute = self.get_minute_of_day(tci.end_time)
+            rows.append((
+                employee.employee_id, employee.employee_name, employee.entity_name, employee.facility_name,
+                week, daily_date, tci.start_time_str, tci.end_time_str, start_minute, end_minute,
+                round(tci.time_diff * 60), regular_hours, overtime_hours
+            ))
+        return rows
+
+    @staticmethod
+    def get_minute_of_day(time):
+        """
+        Get the minutes since midnight for the given datetime object.
+        :param time: datetime object
+        :return: minutes since midnight
+        """
+        return time.hour * 60 + time.minute
+
+    def write(self, file_path, rows):
+        """
+        Write the rows to the given file path in record batches of `batch_size` rows.
+        :param file_path: file path
+        :param rows: iterable of rows (tuple in `FIELDS` order)
+        :return: number of rows written
+        """
+        count = 0
+        if self.file_format == self.PARQUET:
+            writer = pq.ParquetWriter(file_path, self.schema)
+        else:
+            writer = pa.ipc.new_file(file_path, self.schema)
+        try:
+            columns = [[] for field in self.FIELDS]
+            for row in rows:
+                for column, value in zip(columns, row):
+                    column.append(value)
+                count += 1
+                if len(columns[0]) >= self.batch_size:
+                    self.__write_batch(writer, columns)
+                    columns = [[] for field in self.FIELDS]
+            if columns[0] or not count:
+                self.__write_batch(writer, columns)
+        finally:
+            writer.close()
+        print(f"Shift export file '{file_path}' has been created with {count} rows.")
+        return count
+
+    def __write_batch(self, writer, columns):
+        """
+        Write the columns as a single record batch.
+        :param writer: parquet or arrow writer
+        :param columns: list of column value lists
+        """
+        writer.write_batch(pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, self.schema)],
+            schema=self.schema
+        ))
@@ -0,0 +1,441 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import math
+import mmap
+import struct
+from datetime import date, datetime
+
+from employee import Employee
+from weekly_time_card import WeeklyTimeCard
+from week_calendar import WeekCalendar
+from daily_time_card import DailyTimeCard
+from time_card_increments import TimeCardIncrements
+
+
+class SnapshotTimesheet(object):
+    """
+    Lightweight stand-in for a Timesheet object loaded from a snapshot.  It only carries the
+    attributes used after the workbook has been parsed.
+    """
+
+    def __init__(self, entity_facility_name, weekly_date_str, weekly_time_cards):
+        self.entity_facility_name = entity_facility_name
+        self.sheet_name = None      # the sheet names are not stored
+        self.weekly_date_str = weekly_date_str
+        self.id_wtc_dict = {wtc.employee.employee_id: wtc for wtc in weekly_time_cards}
+        self.employee_name_wtc_dict = {wtc.employee.employee_name: wtc for wtc in weekly_time_cards}
+        self.key_wtc_dict = {}      # employee key -> WeeklyTimeCard object (set by the EmployeeIndex)
+        self.shift_ref_list = []    # the cells of the shifts are not stored
+        self.coverage_matrix = None # the schedule grid is not stored
+        self.unknown_id_dict = {}   # reported when the workbook was parsed
+
+
+class Snapshot(object):
+    """
+    Compact binary snapshot of a fully computed run: the facility timesheets, the weekly time
+    cards, the daily totals, and the time card increments.  The merged (multiple facility) time
+    cards are not stored, as TimeCardGenerator builds them on demand from the facility cards.
+    Every section is a flat array of little-endian fixed width values, so the file is read as a
+    set of zero-copy memoryviews over an mmap of the file (nothing is parsed or copied), and the
+    objects are built straight from them.  Loading a snapshot builds every time card up front
+    (see `SnapshotReader.get_weekly_timesheets_list`), as the file is closed once it is loaded.
+
+    Layout (each section is 8 byte aligned):
+        header          MAGIC + VERSION + section counts
+        string offsets  uint32[n_strings + 1]
+        string data     utf-8 bytes
+        timesheets      int32[n_timesheets, 5]  week, entity facility name, weekly date str,
+                                                first card ref, number of card refs
+        card refs       int32[n_card_refs]      card index
+        cards           int32[n_cards, 8]       employee id, name, entity, facility, position,
+                                                weekly date str, date format, first day
+        card hours      float64[n_cards, 4]     total weekly, overtime, double time, extra overtime (NaN = None)
+        days            int32[n_days, 3]        date ordinal, first increment, number of increments
+        day hours       float64[n_days, 3]      total daily, set overtime, set double time (NaN = None)
+        increments      int32[n_incs, 4]        start str, end str, start minute, end minute (past
+                                                1440 for the hours after midnight kept on the last
+                                                Sunday, see `TimeCardIncrements.add_day_offset`)
+        increment hours float64[n_incs]         time difference
+    """
+
+    MAGIC = b'TCSNAP01'
+    VERSION = 5
+    HEADER_FORMAT = '<8sIIIIIIII'
+    TIMESHEET_INTS = 5
+    CARD_INTS = 8
+    CARD_FLOATS = 4
+    DAY_INTS = 3
+    DAY_FLOATS = 3
+    INC_INTS = 4
+
+    def __init__(self):
+        self.strings = []
+        self.string_idx_dict = {}
+        self.timesheet_ints = []
+        self.card_ref_ints = []
+        self.card_ints = []
+        self.card_floats = []
+        self.day_ints = []
+        self.day_floats = []
+        self.inc_ints = []
+        self.inc_floats = []
+        self.card_idx_dict = {}     # id(WeeklyTimeCard) -> card index, so each card is stored once
+
+    def __get_str_idx(self, value):
+        """
+        Get the index of the given string in the string table, adding it if necessary.
+        :param value: string
+        :return: string index
+        """
+        str_idx = self.string_idx_dict.get(value)
+        if str_idx is None:
+            str_idx = len(self.strings)
+            self.strings.append(value)
+            self.string_idx_dict[value] = str_idx
+        return str_idx
+
+    def __add_card(self, wtc):
+        """
+        Add the given WeeklyTimeCard object (with its daily time cards and increments) unless
+        it was already added, and return its card index.
+        :param wtc: WeeklyTimeCard object
+        :return: card index
+        """
+        card_idx = self.card_idx_dict.get(id(wtc))
+        if card_idx is not None:
+            return card_idx
+        card_idx = len(self.card_ints) // self.CARD_INTS
+        self.card_idx_dict[id(wtc)] = card_idx
+        employee = wtc.employee
+        self.card_ints.extend([
+            self.__get_str_idx(employee.employee_id), self.__get_str_idx(employee.employee_name),
+            self.__get_str_idx(employee.entity_name), self.__get_str_idx(employee.facility_name),
+            self.__get_str_idx(employee.position), self.__get_str_idx(wtc.weekly_date_str),
+            self.__get_str_idx(wtc.date_format), len(self.day_ints) // self.DAY_INTS
+        ])
+        self.card_floats.extend([
+            wtc.total_weekly_hours, wtc.overtime_hours, wtc.double_time_hours, self.__to_float(wtc.extra_ot_hours)
+        ])
+        for dtc in wtc.daily_time_card_list:
+            self.day_ints.extend([
+                dtc.daily_date.toordinal(), len(self.inc_floats), len(dtc.in_out_hours_list)
+            ])
+            self.day_floats.extend([
+                dtc.total_daily_hours, self.__to_float(dtc.set_ot_hours), self.__to_float(dtc.set_dt_hours)
+            ])
+            for tci in dtc.in_out_hours_list:
+                self.inc_ints.extend([
+                    self.__get_str_idx(tci.start_time_str), self.__get_str_idx(tci.end_time_str),
+                    tci.start_minute, tci.end_minute
+                ])
+                self.inc_floats.append(tci.time_diff)
+        return card_idx
+
+    @staticmethod
+    def __to_float(value):
+        """
+        Convert the optional value into a float, using NaN for None.
+        :param value: number or None
+        :return: float
+        """
+        return math.nan if value is None else float(value)
+
+    def add_timesheet(self, week, timesheet):
+        """
+        Add the given facility Timesheet object and all its weekly time cards.
+        :param week: week number
+        :param timesheet: Timesheet object
+        """
+        wtc_list = list(timesheet.id_wtc_dict.values())
+        self.timesheet_ints.extend([
+            week, self.__get_str_idx(timesheet.entity_facility_name), self.__get_str_idx(timesheet.weekly_date_str),
+            len(self.card_ref_ints), len(wtc_list)
+        ])
+        for wtc in wtc_list:
+            self.card_ref_ints.append(self.__add_card(wtc))
+
+    def write(self, file_path):
+        """
+        Write the snapshot to the given file path.
+        :param file_path: file path
+        """
+        string_data = bytearray()
+        string_offsets = [0]
+        for value in self.strings:
+            string_data += value.encode('utf-8')
+            string_offsets.append(len(string_data))
+        sections = [
+            struct.pack('<{0}I'.format(len(string_offsets)), *string_offsets),
+            bytes(string_data),
+            struct.pack('<{0}i'.format(len(self.timesheet_ints)), *self.timesheet_ints),
+            struct.pack('<{0}i'.format(len(self.card_ref_ints)), *self.card_ref_ints),
+            struct.pack('<{0}i'.format(len(self.card_ints)), *self.card_ints),
+            struct.pack('<{0}d'.format(len(self.card_floats)), *self.card_floats),
+            struct.pack('<{0}i'.format(len(self.day_ints)), *self.day_ints),
+            struct.pack('<{0}d'.format(len(self.day_floats)), *self.day_floats),
+            struct.pack('<{0}i'.format(len(self.inc_ints)), *self.inc_ints),
+            struct.pack('<{0}d'.format(len(self.inc_floats)), *self.inc_floats),
+        ]
+        header = struct.pack(
+            self.HEADER_FORMAT, self.MAGIC, self.VERSION, len(self.strings), len(string_data),
+            len(self.timesheet_ints) // self.TIMESHEET_INTS, len(self.card_ref_ints), len(self.card_floats) // self.CARD_FLOATS,
+            len(self.day_floats) // self.DAY_FLOATS, len(self.inc_floats)
+        )
+        with open(file_path, 'wb') as file:
+            file.write(self.__pad(header))
+            for section in sections:
+                file.write(self.__pad(section))
+        print(f"Snapshot file '{file_path}' has been created.")
+
+    @staticmethod
+    def __pad(data):
+        """
+        Pad the given bytes to a multiple of 8 bytes so the next section stays aligned.
+        :param data: bytes
+        :return: padded bytes
+        """
+        return data + b'\0' * (-len(data) % 8)
+
+    @classmethod
+    def from_generator(cls, time_card_generator):
+        """
+        Build the snapshot for the given (fully computed) TimeCardGenerator object.
+        :param time_card_generator: TimeCardGenerator object
+        :return: Snapshot object
+        """
+        snapshot = cls()
+        for week_idx, weekly_timesheets in enumerate(time_card_generator.weekly_timesheets_list):
+            for timesheet in weekly_timesheets:
+                snapshot.add_timesheet(week_idx + 1, timesheet)
+        return snapshot
+
+
+class SnapshotReader(object):
+    """
+    Read a snapshot written by the Snapshot class.  The file is memory mapped, and every
+    section is exposed as a zero-copy memoryview cast to its value type.
+    """
+
+    def __init__(self, file_path):
+        with open(file_path, 'rb') as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = memoryview(self.mmap)
+        header_size = struct.calcsize(Snapshot.HEADER_FORMAT)
+        magic, version, n_strings, string_data_len, n_timesheets, n_card_refs, n_cards, n_days, n_incs = \
+            struct.unpack_from(Snapshot.HEADER_FORMAT, self.buffer)
+        if magic != Snapshot.MAGIC or version != Snapshot.VERSION:
+            raise Exception('`{0}` is not a version {1} time card snapshot'.format(file_path, Snapshot.VERSION))
+        self.offset = header_size + (-header_size % 8)
+        self.string_offsets = self.__get_section('I', 4 * (n_strings + 1))
+        self.string_data = self.__get_section('B', string_data_len)
+        self.timesheet_ints = self.__get_section('i', 4 * Snapshot.TIMESHEET_INTS * n_timesheets)
+        self.card_ref_ints = self.__get_section('i', 4 * n_card_refs)
+        self.card_ints = self.__get_section('i', 4 * Snapshot.CARD_INTS * n_cards)
+        self.card_floats = self.__get_section('d', 8 * Snapshot.CARD_FLOATS * n_cards)
+        self.day_ints = self.__get_section('i', 4 * Snapshot.DAY_INTS * n_days)
+        self.day_floats = self.__get_section('d', 8 * Snapshot.DAY_FLOATS * n_days)
+        self.inc_ints = self.__get_section('i', 4 * Snapshot.INC_INTS * n_incs)
+        self.inc_floats = self.__get_section('d', 8 * n_incs)
+        self.n_timesheets = n_timesheets
+        self.n_cards = n_cards
+        self.string_cache = {}
+        self.card_cache = {}
+        self.week_calendar_cache = {}   # weekly date string -> WeekCalendar object
+
+    def __get_section(self, value_format, size):
+        """
+        Get the next section as a memoryview of the given value format, and move past it.
+        :param value_format: struct format character
+        :param size: section size in bytes
+        :return: memoryview
+        """
+        section = self.buffer[self.offset:self.offset + size].cast(value_format)
+        self.offset += size + (-size % 8)
+        return section
+
+    def get_str(self, str_idx):
+        """
+        Get the string for the given string index.
+        :param str_idx: string index
+        :return: string
+        """
+        value = self.string_cache.get(str_idx)
+        if value is None:
+            value = bytes(self.string_data[self.string_offsets[str_idx]:self.string_offsets[str_idx + 1]]).decode('utf-8')
+            self.string_cache[str_idx] = value
+        return value
+
+    @staticmethod
+    def __from_float(value):
+        """
+        Convert the float back into the optional value, using None for NaN.
+        :param value: float
+        :return: number or None
+        """
+        if math.isnan(value):
+            return None
+        return int(value) if value.is_integer() else value
+
+    def get_weekly_time_card(self, card_idx):
+        """
+        Materialize the WeeklyTimeCard object for the given card index.  The same card index
+        always returns the same object.
+        :param card_idx: card index
+        :return: WeeklyTimeCard object
+        """
+        wtc = self.card_cache.get(card_idx)
+        if wtc is not None:
+            return wtc
+        ints = self.card_ints[card_idx * Snapshot.CARD_INTS:(card_idx + 1) * Snapshot.CARD_INTS]
+        floats = self.card_floats[card_idx * Snapshot.CARD_FLOATS:(card_idx + 1) * Snapshot.CARD_FLOATS]
+        employee = Employee.__new__(Employee)
+        employee.employee_id = self.get_str(ints[0])
+        employee.employee_name = self.get_str(ints[1])
+        employee.entity_name = self.get_str(ints[2])
+        employee.facility_name = self.get_str(ints[3])
+        employee.position = self.get_str(ints[4])
+        employee.employee_key = None
+        wtc = WeeklyTimeCard.__new__(WeeklyTimeCard)
+        wtc.date_format = self.get_str(ints[6])
+        wtc.weekly_date_str = self.get_str(ints[5])
+        wtc.week_calendar = self.__get_week_calendar(wtc.weekly_date_str)
+        wtc.employee = employee
+        wtc.total_weekly_hours = self.__from_float(floats[0])
+        wtc.daily_time_card_list = [
+            self.__get_daily_time_card(ints[7] + idx, wtc.week_calendar, idx) for idx in range(WeeklyTimeCard.DAYS_IN_WEEK)
+        ]
+        wtc.overtime_hours = self.__from_float(floats[1])
+        wtc.overtime_evaluated = False
+        wtc.double_time_hours = self.__from_float(floats[2])
+        wtc.extra_ot_hours = self.__from_float(floats[3])
+        wtc.overtime_evaluator = WeeklyTimeCard.DEFAULT_OVERTIME_EVALUATOR
+        wtc.next_week_hours_list = []
+        self.card_cache[card_idx] = wtc
+        return wtc
+
+    def __get_week_calendar(self, weekly_date_str):
+        """
+        Get the WeekCalendar object for the given weekly date string, shared by every card of
+        that week.
+        :param weekly_date_str: weekly date string
+        :return: WeekCalendar object
+        """
+        week_calendar = self.week_calendar_cache.get(weekly_date_str)
+        if week_calendar is None:
+            week_calendar = self.week_calendar_cache[weekly_date_str] = WeekCalendar(weekly_date_str)
+        return week_calendar
+
+    def __get_daily_time_card(self, day_idx, week_calendar, weekday_idx):
+        """
+        Materialize the DailyTimeCard object for the given day index.
+        :param day_idx: day index
+        :param week_calendar: WeekCalendar object of the card
+        :param weekday_idx: index of the day in the week
+        :return: DailyTimeCard object
+        """
+        date_ordinal, first_inc, n_incs = self.day_ints[day_idx * Snapshot.DAY_INTS:(day_idx + 1) * Snapshot.DAY_INTS]
+        dtc = DailyTimeCard.from_date(
+            date.fromordinal(date_ordinal), week_calendar.wtc_dates[weekday_idx], week_calendar.day_names[weekday_idx]
+        )
+        dtc.set_in_out_hours_list([self.__get_time_card_increments(first_inc + idx) for idx in range(n_incs)])
+        dtc.total_daily_hours = self.__from_float(self.day_floats[day_idx * Snapshot.DAY_FLOATS])
+        dtc.set_ot_hours = self.__from_float(self.day_floats[day_idx * Snapshot.DAY_FLOATS + 1])
+        dtc.set_dt_hours = self.__from_float(self.day_floats[day_idx * Snapshot.DAY_FLOATS + 2])
+        return dtc
+
+    def __get_time_card_increments(self, inc_idx):
+        """
+        Materialize the TimeCardIncrements object for the given increment index.  The start and
+        end minutes are stored as is (including the day offset, so the increments sort as in the
+        original run), and the start and end times are their time of day, with the same default
+        date as `datetime.strptime`.
+        :param inc_idx: increment index
+        :return: TimeCardIncrements object
+        """
+        start_str, end_str, start_minute, end_minute = \
+            self.inc_ints[inc_idx * Snapshot.INC_INTS:(inc_idx + 1) * Snapshot.INC_INTS]
+        tci = TimeCardIncrements.__new__(TimeCardIncrements)
+        tci.start_time_str = self.get_str(start_str)
+        tci.end_time_str = self.get_str(end_str)
+        tci.start_time = datetime(1900, 1, 1, *divmod(start_minute % TimeCardIncrements.MINUTES_IN_DAY, 60))
+        tci.end_time = datetime(1900, 1, 1, *divmod(end_minute % TimeCardIncrements.MINUTES_IN_DAY, 60))
+        tci.time_diff = self.inc_floats[inc_idx]
+        tci.start_minute = start_minute
+        tci.end_minute = end_minute
+        return tci
+
+    def get_timesheets(self, week):
+        """
+        Get the facility timesheets for the given week number.
+        :param week: week number
+        :return: list of SnapshotTimesheet objects
+        """
+        timesheets = []
+        for ts_idx in range(self.n_timesheets):
+            ts_week, entity_facility_name, weekly_date_str, first_ref, n_refs = \
+                self.timesheet_ints[ts_idx * Snapshot.TIMESHEET_INTS:(ts_idx + 1) * Snapshot.TIMESHEET_INTS]
+            if ts_week == week:
+                weekly_time_cards = [
+                    self.get_weekly_time_card(self.card_ref_ints[ref_idx])
+                    for ref_idx in range(first_ref, first_ref + n_refs)
+                ]
+                timesheets.append(SnapshotTimesheet(
+                    self.get_str(entity_facility_name), self.get_str(weekly_date_str), weekly_time_cards
+                ))
+        return timesheets
+
+    def get_weekly_timesheets_list(self):
+        """
+        Get the facility timesheets of every week, from week 1 up to the last week stored.  Every
+        weekly time card is built.
+        :return: list of lists of SnapshotTimesheet objects, one list per week
+        """
+        n_weeks = max((self.timesheet_ints[ts_idx * Snapshot.TIMESHEET_INTS] for ts_idx in range(self.n_timesheets)), default=0)
+        return [self.get_timesheets(week_idx + 1) for week_idx in range(n_weeks)]
+
+    def close(self):
+        """
+        Release the memoryviews and close the memory map.
+        """
+        for name in ['string_offsets', 'string_data', 'timesheet_ints', 'card_ref_ints', 'card_ints',
+                     'card_floats', 'day_ints', 'day_floats', 'inc_ints', 'inc_floats']:
+            getattr(self, name).release()
+        self.buffer.release()
+        self.mmap.close()
+
+
+if __name__ == "__main__":
+    import sys
+    from time_card_generator import TimeCardGenerator
+
+    print('Start Testing Snapshot...\n')
+
+    # round trip: every time card increment of the reloaded snapshot matches the original run
+    test_tc_generator = TimeCardGenerator(sys.argv[1] if len(sys.argv) > 1 else 'resources/Schedule Example #3.xlsx')
+    # keep hours after midnight on the last Sunday (as without a following week), so their
+    # start minute is past 1440
+    test_wtc = next(iter(test_tc_generator.weekly_timesheets_list[-1][0].id_wtc_dict.values()))
+    test_wtc.next_week_hours_list = [TimeCardIncrements('12AM-2AM')]
+    test_wtc.keep_next_week_hours()
+    test_tc_generator.save_snapshot('output/test_snapshot.snap')
+    test_snapshot_reader = SnapshotReader('output/test_snapshot.snap')
+
+    def get_test_incs(weekly_timesheets_list):
+        return [
+            (tci.start_time_str, tci.end_time_str, tci.start_time, tci.end_time, tci.start_minute, tci.end_minute,
+             tci.time_diff)
+            for weekly_timesheets in weekly_timesheets_list for timesheet in weekly_timesheets
+            for wtc in timesheet.id_wtc_dict.values() for dtc in wtc.daily_time_card_list
+            for tci in dtc.in_out_hours_list
+        ]
+
+    test_incs = get_test_incs(test_tc_generator.weekly_timesheets_list)
+    test_snapshot_incs = get_test_incs(test_snapshot_reader.get_weekly_timesheets_list())
+    print('{0} increments ({1} after midnight on the last Sunday), round trip identical: {2}'.format(
+        len(test_incs), sum(1 for test_inc in test_incs if test_inc[4] >= TimeCardIncrements.MINUTES_IN_DAY),
+        test_incs == test_snapshot_incs
+    ))
+    test_snapshot_reader.close()
+
+    print('\nEnd Testing Snapshot\n')
@@ -0,0 +1,154 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+
+class SummaryHours(object):
+    """
+    Summary hours of a pay period, aggregated in a single pass and grouped by facility, employee,
+    and week.  The overtime of each weekly time card is only evaluated once (it is cached on the
+    card), and every summary table (the combined table and a table per facility, in html or in
+    the excel export) renders from the result.
+    The groups are:
+        - `COMBINED`: a row per pay period (the employee's hours at every facility)
+        - a group per facility of the 1st week that has a timesheet in every week: a row per
+          employee of the facility, the employees of the 1st week first
+    """
+
+    COMBINED = None
+
+    def __init__(self, pay_periods, weekly_timesheets_list):
+        self.n_weeks = len(weekly_timesheets_list)
+        # group -> list of rows: [employee name, 2nd column value, list of (regular, overtime) hours per week]
+        self.group_rows_dict = {self.COMBINED: []}
+        for pay_period in pay_periods:
+            self.group_rows_dict[self.COMBINED].append([
+                pay_period.employee_name, pay_period.facility_name, self.__get_week_hours(pay_period.weekly_time_cards)
+            ])
+        for facility_name, facility_timesheets in self.__get_facility_timesheets_list(weekly_timesheets_list):
+            self.group_rows_dict[facility_name] = self.__get_facility_rows(facility_timesheets)
+
+    def get_facility_names(self):
+        """
+        Get the facility names (ie every group but the combined one), in table order.
+        :return: list of facility names
+        """
+        return [group for group in self.group_rows_dict if group is not self.COMBINED]
+
+    def get_rows(self, group=COMBINED):
+        """
+        Get the rows of the given group, with the summary hours of each row (see `get_summary_hours`).
+        :param group: `COMBINED` or a facility name
+        :return: list of (employee name, 2nd column value, summary hours)
+        """
+        return [
+            (employee_name, col_2_value, self.get_summary_hours(week_hours))
+            for employee_name, col_2_value, week_hours in self.group_rows_dict[group]
+        ]
+
+    def get_total_summary_hours(self, group=COMBINED):
+        """
+        Get the summary hours summed over every row of the given group.
+        :param group: `COMBINED` or a facility name
+        :return: list of summary hours
+        """
+        total_summary_hours = [0] * (2 * self.n_weeks + 3)
+        for _, _, summary_hours in self.get_rows(group):
+            total_summary_hours = [total + hours for total, hours in zip(total_summary_hours, summary_hours)]
+        return total_summary_hours
+
+    @staticmethod
+    def get_summary_hours(week_hours):
+        """
+        Get the regular hours and overtime hours of each week, followed by the total regular
+        hours, total overtime hours, and total hours.
+        :param week_hours: list of (regular, overtime) hours, one per week
+        :return: list of summary hours
+        """
+        summary_hours = []
+        total_reg_hours = 0
+        total_ot_hours = 0
+        for reg_hours, ot_hours in week_hours:
+            summary_hours.extend([reg_hours, ot_hours])
+            total_reg_hours += reg_hours
+            total_ot_hours += ot_hours
+        summary_hours.extend([total_reg_hours, total_ot_hours, total_reg_hours + total_ot_hours])
+        return summary_hours
+
+    @staticmethod
+    def __get_facility_timesheets_list(weekly_timesheets_list):
+        """
+        Get the timesheet of each week for every facility of the 1st week that has a timesheet in
+        every week.
+        :param weekly_timesheets_list: list of lists of Timesheet objects, one list per week
+        :return: generator of (facility name, list of Timesheet objects, one per week)
+        """
+        for first_timesheet in (weekly_timesheets_list[0] if weekly_timesheets_list else []):
+            facility_timesheets = []
+            for weekly_timesheets in weekly_timesheets_list:
+                facility_timesheets.append(next((
+                    timesheet for timesheet in weekly_timesheets
+                    if timesheet.entity_facility_name == first_timesheet.entity_facility_name
+                ), None))
+            if all(facility_timesheets):
+                yield first_timesheet.entity_facility_name, facility_timesheets
+
+    def __get_facility_rows(self, facility_timesheets):
+        """
+        Get the rows of a facility: the employees of the 1st week come first, followed by the
+        employees who only started working at the facility in a later week.  The 2nd column is
+        the employee id of each week.
+        :param facility_timesheets: list of Timesheet objects, one per week
+        :return: list of rows
+        """
+        rows = []
+        employee_key_set = set()
+        for timesheet in facility_timesheets:
+            for employee_key, wtc in timesheet.key_wtc_dict.items():
+                if employee_key in employee_key_set:
+                    continue
+                employee_key_set.add(employee_key)
+                wtc_list = [facility_timesheet.key_wtc_dict.get(employee_key) for facility_timesheet in facility_timesheets]
+                col_2_value = ' & '.join(week_wtc.employee.employee_id if week_wtc else '' for week_wtc in wtc_list)
+                rows.append([wtc.employee.employee_name, col_2_value, self.__get_week_hours(wtc_list)])
+        return rows
+
+    def __get_week_hours(self, weekly_time_cards):
+        """
+        Get the regular and overtime hours of each week (0 if the employee did not work that week).
+        The overtime is evaluated once per weekly time card.  Remove the decimal if the hours are
+        a whole number.
+        :param weekly_time_cards: list of WeeklyTimeCard objects (or None), one per week
+        :return: list of (regular, overtime) hours, one per week
+        """
+        week_hours = []
+        for wtc in weekly_time_cards:
+            if wtc:
+                ot_hours = wtc.get_overtime_hours()
+                week_hours.append((
+                    self.__remove_decimal_if_whole(wtc.total_weekly_hours - ot_hours),
+                    self.__remove_decimal_if_whole(ot_hours)
+                ))
+            else:
+                week_hours.append((0, 0))
+        return week_hours
+
+    @staticmethod
+    def __remove_decimal_if_whole(input_num):
+        """
+        Remove the decimal if the input number is a whole number.
+        :param input_num: input number
+        :return: number
+        """
+        return int(input_num) if isinstance(input_num, float) and input_num.is_integer() else input_num
+
+
+if __name__ == "__main__":
+    from time_card_generator import TimeCardGenerator
+
+    print('Start Testing SummaryHours...\n')
+
+    test_summary_hours = TimeCardGenerator('resources/Schedule Example #3.xlsx').get_summary_hours()
+    for test_group in [SummaryHours.COMBINED] + test_summary_hours.get_facility_names():
+        print(test_group or 'Combined', test_summary_hours.get_total_summary_hours(test_group))
+
+    print('\nEnd Testing SummaryHours\n')
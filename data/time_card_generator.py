@@ -1,17 +1,31 @@
 __author__ = "Cal Ochoa"
 __email__ = "CalOchoa@gmail.com"
 
-import pandas as pd
-import zipfile
+import argparse
+import asyncio
 import os
 import copy
+import functools
+import re
 
-from timesheet import Timesheet
 from weekly_time_card import WeeklyTimeCard
-from daily_time_card import DailyTimeCard
+from overtime_rules import OvertimeRuleSet
+from employee_index import EmployeeIndex
+from double_booking import DoubleBookingDetector
 from pay_period import PayPeriod
 from wtc_template import WeeklyTimeCardTemplate
 from summary_template import SummaryTemplate
+from summary_hours import SummaryHours
+from combined_time_cards import CombinedTimeCards
+from html_style import HtmlStyle
+from zip_archiver import ZipArchiver
+from hours_export import HoursExport
+from xlsx_export import XlsxExport
+from coverage_report import CoverageReport
+from validation_report import ValidationReport
+from snapshot import Snapshot, SnapshotReader
+from history_store import HistoryStore
+from profiler import Profiler
 
 
 class TimeCardGenerator(object):
@@ -20,245 +34,374 @@ class TimeCardGenerator(object):
     displayed in the excel spreadsheet.
     """
 
-    WEEK_1 = 'week 1'
-    WEEK_2 = 'week 2'
-
-    def __init__(self, excel_spreadsheet_filename):
-        sheet_names = self.__get_sheet_names(excel_spreadsheet_filename)
-        self.week_1_timesheets = self.__get_weekly_timesheets(excel_spreadsheet_filename, sheet_names, self.WEEK_1)
-        self.week_2_timesheets = self.__get_weekly_timesheets(excel_spreadsheet_filename, sheet_names, self.WEEK_2)
-        self.week_1_time_cards = self.__get_weekly_time_cards(self.week_1_timesheets)
-        self.week_2_time_cards = self.__get_weekly_time_cards(self.week_2_timesheets)
-        self.employee_name_pay_period_dict = self.__get_employee_name_pay_period_dict(
-            self.week_1_time_cards, self.week_2_time_cards
+    WEEK_SHEET_NAME_PATTERN = re.compile(r'week\s*(\d+)', re.IGNORECASE)   # ie `Week 1 Taconic`
+    WEEK_X = 'week {0}'
+
+    DEFAULT_OUTPUT_DIR = 'output/summary + time cards/'
+    DEFAULT_ZIP_FILE_PATH = 'output/summary+time_cards.zip'
+    WRITE_QUEUE_SIZE = 32   # max rendered html files waiting to be written
+
+    def __init__(self, excel_spreadsheet_filename, overtime_rule_set=None, strict=False):
+        """
+        :param excel_spreadsheet_filename: excel spreadsheet with a `week X` sheet per facility per week
+        :param overtime_rule_set: OvertimeRuleSet object (defaults to the default rules)
+        :param strict: True to raise an exception if the excel file can't be read or has no
+                       `week X` sheet, instead of printing the error and creating no time cards
+        """
+        self.overtime_evaluator = (overtime_rule_set or OvertimeRuleSet()).compile()
+        sheet_names = self.__get_sheet_names(excel_spreadsheet_filename, strict)
+        # list of Timesheet objects for each week of the pay period
+        self.weekly_timesheets_list = self.__get_weekly_timesheets_list(
+            excel_spreadsheet_filename, sheet_names, self.overtime_evaluator
         )
+        if strict and not self.weekly_timesheets_list:
+            raise Exception('the excel file has no `week X` schedule sheet')
+        self.employee_index = EmployeeIndex(self.weekly_timesheets_list)
+        self.merged_wtc_dict = {}   # (1st facility card, 2nd facility card) -> merged WeeklyTimeCard object
+        self.__add_next_week_hours(self.weekly_timesheets_list)
+        self.double_bookings = DoubleBookingDetector(self.weekly_timesheets_list).report()
+        for weekly_timesheets in self.weekly_timesheets_list:
+            self.__adjust_weekly_timesheets_multiple_facilities(weekly_timesheets)
         self.wtc_template = WeeklyTimeCardTemplate()
         self.summary_template = SummaryTemplate()
 
+    @classmethod
+    def from_snapshot(cls, snapshot_file_path, overtime_rule_set=None):
+        """
+        Create the TimeCardGenerator object from a snapshot of a previously computed run, without
+        reading the excel file (or importing pandas).  The overtime rule set should be the one
+        the snapshot was computed with, as the overtime hours across facilities are stored.
+        :param snapshot_file_path: snapshot file path
+        :param overtime_rule_set: OvertimeRuleSet object (defaults to the default rules)
+        :return: TimeCardGenerator object
+        """
+        snapshot_reader = SnapshotReader(snapshot_file_path)
+        tc_generator = cls.__new__(cls)
+        tc_generator.overtime_evaluator = (overtime_rule_set or OvertimeRuleSet()).compile()
+        tc_generator.weekly_timesheets_list = snapshot_reader.get_weekly_timesheets_list()
+        tc_generator.employee_index = EmployeeIndex(tc_generator.weekly_timesheets_list)
+        tc_generator.merged_wtc_dict = {}
+        tc_generator.double_bookings = []   # the cells of the shifts are not stored
+        for weekly_timesheets in tc_generator.weekly_timesheets_list:
+            for timesheet in weekly_timesheets:
+                for wtc in timesheet.id_wtc_dict.values():
+                    wtc.set_overtime_evaluator(tc_generator.overtime_evaluator)
+        tc_generator.wtc_template = WeeklyTimeCardTemplate()
+        tc_generator.summary_template = SummaryTemplate()
+        snapshot_reader.close()
+        return tc_generator
+
+    @property
+    def n_weeks(self):
+        """
+        Number of weeks in the pay period.
+        :return: number of weeks
+        """
+        return len(self.weekly_timesheets_list)
+
+    @property
+    def week_1_timesheets(self):
+        """
+        List of the week 1 Timesheet objects (see `weekly_timesheets_list`).
+        :return: list of Timesheet objects
+        """
+        return self.get_weekly_timesheets(0)
+
+    @property
+    def week_2_timesheets(self):
+        """
+        List of the week 2 Timesheet objects (see `weekly_timesheets_list`).
+        :return: list of Timesheet objects
+        """
+        return self.get_weekly_timesheets(1)
+
+    @property
+    def week_1_time_cards(self):
+        """
+        Materialized list of the week 1 WeeklyTimeCard objects (see `get_weekly_time_cards`).
+        :return: list of WeeklyTimeCard objects
+        """
+        return self.get_weekly_time_cards(0)
+
+    @property
+    def week_2_time_cards(self):
+        """
+        Materialized list of the week 2 WeeklyTimeCard objects (see `get_weekly_time_cards`).
+        :return: list of WeeklyTimeCard objects
+        """
+        return self.get_weekly_time_cards(1)
+
+    def get_weekly_timesheets(self, week_idx):
+        """
+        Get the Timesheet objects for the given week index (empty if there is no such week).
+        :param week_idx: week index (0 for week 1)
+        :return: list of Timesheet objects
+        """
+        return self.weekly_timesheets_list[week_idx] if week_idx < self.n_weeks else []
+
+    def get_weekly_time_cards(self, week_idx):
+        """
+        Materialized list of the WeeklyTimeCard objects for the given week index.  Prefer
+        `iter_weekly_time_cards` or `iter_pay_periods`, which do not keep every card alive.
+        :param week_idx: week index (0 for week 1)
+        :return: list of WeeklyTimeCard objects
+        """
+        return list(self.iter_weekly_time_cards(self.get_weekly_timesheets(week_idx)))
+
+    @property
+    def employee_name_pay_period_dict(self):
+        """
+        Materialized dictionary of employee name to PayPeriod object.  Prefer `iter_pay_periods`,
+        which does not keep every pay period alive.
+        :return: dictionary
+        """
+        return {pay_period.employee_name: pay_period for pay_period in self.iter_pay_periods()}
+
+    def save_snapshot(self, snapshot_file_path):
+        """
+        Save a binary snapshot of the computed run, so it can be re-rendered or re-exported later
+        with `from_snapshot`.
+        :param snapshot_file_path: snapshot file path
+        """
+        Snapshot.from_generator(self).write(snapshot_file_path)
+
     @staticmethod
-    def __get_sheet_names(excel_spreadsheet_filename):
+    def __get_sheet_names(excel_spreadsheet_filename, strict=False):
         """
         Get the sheet names for the given excel file.
         :param excel_spreadsheet_filename: excel file
+        :param strict: True to raise an exception if the excel file can't be read
         :return: list of sheet names
         """
+        # pandas (and Timesheet) are imported lazily so runs loaded from a snapshot skip them
+        import pandas as pd
+
         sheet_names = []
         try:
             xls = pd.ExcelFile(excel_spreadsheet_filename)
             sheet_names = xls.sheet_names
         except Exception as e:
+            if strict:
+                raise Exception(f"Error reading the Excel file: {e}")
             print(f"Error reading the Excel file: {e}")
         return sheet_names
 
-    @staticmethod
-    def __get_weekly_timesheets(excel_spreadsheet_filename, sheet_names, week_x_name):
+    @classmethod
+    def __get_weekly_timesheets_list(cls, excel_spreadsheet_filename, sheet_names, overtime_evaluator):
         """
-        Get the weekly Timesheet objects for the given excel file and weekly sheet names that start
-        with the `week_x_name`.
+        Get the weekly Timesheet objects for the given excel file, grouped by the week number of
+        the sheet names starting with `week X` (any number of weeks, in week number order).
         :param excel_spreadsheet_filename: excel file
         :param sheet_names: list of sheet names
-        :return: list of Timesheet objects
-        """
-        week_x_sheet_names = [sheet for sheet in sheet_names if sheet.lower().startswith(week_x_name)]
-        return [Timesheet(excel_spreadsheet_filename, sheet_name=sheet) for sheet in week_x_sheet_names]
+        :param overtime_evaluator: OvertimeEvaluator object
+        :return: list of lists of Timesheet objects, one list per week
+        """
+        from timesheet import Timesheet
+
+        week_sheet_names_dict = {}
+        for sheet in sheet_names:
+            match = cls.WEEK_SHEET_NAME_PATTERN.match(sheet)
+            if match:
+                week_sheet_names_dict.setdefault(int(match.group(1)), []).append(sheet)
+        return [
+            [
+                Timesheet(excel_spreadsheet_filename, sheet_name=sheet, overtime_evaluator=overtime_evaluator)
+                for sheet in week_sheet_names_dict[week]
+            ]
+            for week in sorted(week_sheet_names_dict)
+        ]
 
-    def __get_weekly_time_cards(self, weekly_timesheets):
+    @staticmethod
+    def __add_next_week_hours(weekly_timesheets_list):
+        """
+        Add the hours after midnight of the overnight shifts starting on a Sunday to the same
+        employee's time card (by key) for the same facility in the following week, creating
+        the time card if the employee is not on that timesheet.  If there is no following week
+        (the next week sheet is missing, or its dates do not follow this week's), then the hours
+        are kept on Sunday.
+        :param weekly_timesheets_list: list of lists of Timesheet objects, one list per week
+        """
+        for week_idx, weekly_timesheets in enumerate(weekly_timesheets_list):
+            next_weekly_timesheets = weekly_timesheets_list[week_idx + 1] \
+                if week_idx + 1 < len(weekly_timesheets_list) else []
+            for timesheet in weekly_timesheets:
+                next_timesheet = next((
+                    next_ts for next_ts in next_weekly_timesheets
+                    if next_ts.entity_facility_name == timesheet.entity_facility_name
+                ), None)
+                # the sheets are numbered by week, but a week may be missing from the schedule
+                if next_timesheet is not None and \
+                        not timesheet.get_week_calendar().is_followed_by(next_timesheet.get_week_calendar()):
+                    next_timesheet = None
+                for wtc in list(timesheet.id_wtc_dict.values()):
+                    if not wtc.next_week_hours_list:
+                        continue
+                    if next_timesheet is None:
+                        print('No following week for the overnight shift of `{0}`, keeping it on Sunday'.format(
+                            wtc.employee.employee_name
+                        ))
+                        wtc.keep_next_week_hours()
+                        continue
+                    next_wtc = next_timesheet.key_wtc_dict.get(wtc.employee.employee_key)
+                    if next_wtc is None:
+                        next_wtc = WeeklyTimeCard(
+                            next_timesheet.weekly_date_str, copy.copy(wtc.employee),
+                            overtime_evaluator=wtc.overtime_evaluator, week_calendar=next_timesheet.get_week_calendar()
+                        )
+                        next_timesheet.add_weekly_time_card(next_wtc)
+                    next_wtc.add_next_week_hours(wtc)
+
+    def __adjust_weekly_timesheets_multiple_facilities(self, weekly_timesheets):
         """
-        Get the weekly time cards for the given weekly timesheets.  Currently, there should only be 
-        at most 2 timesheets (ie 2 facilities) for a given week.  If there are 2 timesheets, then
-        we want to check if a person worked at both facilities and combine there hours into a single
-        time card.
+        Adjust the summary hours of every employee who worked at both facilities for the given
+        weekly timesheets.  Currently, there should only be at most 2 timesheets (ie 2 facilities)
+        for a given week.  The overtime hours of both facilities are evaluated together, and each
+        facility WeeklyTimeCard object keeps the overtime hours worked there (see
+        `OvertimeEvaluator.evaluate`).
         :param weekly_timesheets: list of Timesheet objects
-        :return: list of WeeklyTimeCard objects
         """
-        weekly_time_cards = []
-        timesheet_1 = weekly_timesheets[0]
         if len(weekly_timesheets) == 2:
-            timesheet_2 = weekly_timesheets[1]
-            employee_name_wtc_dict_1 = timesheet_1.employee_name_wtc_dict 
-            employee_name_wtc_dict_2 = timesheet_2.employee_name_wtc_dict 
-            employee_name_set = set()
-            # iterate over 1st timesheet and add all values while combining duplicate employees from 2nd timesheet
-            for employee_name, original_wtc in employee_name_wtc_dict_1.items():
-                employee_name_set.add(employee_name)
-                wtc = copy.deepcopy(original_wtc)
-                wtc_2 = employee_name_wtc_dict_2.get(employee_name)
-                if wtc_2 and wtc.weekly_date_str == wtc_2.weekly_date_str:
-                    wtc.employee.facility_name += ' & {0}'.format(wtc_2.employee.facility_name)
-                    wtc.total_weekly_hours += wtc_2.total_weekly_hours
-                    self.__adjust_summary_hours_multiple_facilities(original_wtc, wtc_2)
-                    for idx, daily_time_card_1 in enumerate(wtc.daily_time_card_list):
-                        daily_time_card_2 = wtc_2.daily_time_card_list[idx]
-                        daily_time_card_1.total_daily_hours += daily_time_card_2.total_daily_hours
-                        if daily_time_card_2.in_out_hours_list:
-                            if daily_time_card_1.in_out_hours_list:
-                                daily_time_card_1.in_out_hours_list = self.__combine_in_out_hour_lists(
-                                    daily_time_card_1.in_out_hours_list, daily_time_card_2.in_out_hours_list
-                                )
-                            else:
-                                daily_time_card_1.in_out_hours_list = daily_time_card_2.in_out_hours_list
-                    weekly_time_cards.append(wtc)
-                    #del employee_name_wtc_dict_2[employee_name]
-                else:
-                    weekly_time_cards.append(wtc)
-            # iterate over 2nd timesheet and add all values while ignoring duplicate employees from 1st timesheet
-            for employee_name, original_wtc in employee_name_wtc_dict_2.items():
-                if employee_name not in employee_name_set:
-                    weekly_time_cards.append(copy.deepcopy(original_wtc))
-        else:
-            weekly_time_cards = timesheet_1.id_wtc_dict.values()
-        return weekly_time_cards
-
-    def __adjust_summary_hours_multiple_facilities(self, wtc_1, wtc_2):
-        """
-        Correctly caclulate the summary hours for an employee who works in multiple facilities.
-        Ensure that each facility is showing the correct overtime hours as both facilities
-        need to be accounted for.
-        :param wtc_1: WeeklyTimeCard object 1
-        :param wtc_2: WeeklyTimeCard object 2
-        """
-        current_weekly_hours = 0
-        for idx, dtc_1 in enumerate(wtc_1.daily_time_card_list):
-            current_daily_hours = 0
-            dtc_2 = wtc_2.daily_time_card_list[idx]
-            total_daily_hours = dtc_1.total_daily_hours + dtc_2.total_daily_hours
-            # check if we will exceed normal weekly or daily hours
-            if self.__has_weekly_ot_hours(current_weekly_hours, total_daily_hours) \
-                    or self.__has_daily_ot_hours(current_daily_hours, total_daily_hours):
-                # accumulate overtime hours in the correct WeeklyTimeCard
-                index1 = 0
-                index2 = 0
-                list1 = dtc_1.in_out_hours_list
-                list2 = dtc_2.in_out_hours_list
-                # iterate over both lists until there are no more hours
-                while index1 < len(list1) or index2 < len(list2):
-                    # check if both lists have hours
-                    if index1 < len(list1) and index2 < len(list2):
-                        if list1[index1].start_time < list2[index2].start_time:
-                            current_weekly_hours, current_daily_hours = self.__add_extra_ot_hours(
-                                wtc_1, current_weekly_hours, current_daily_hours, list1[index1].time_diff
-                            )
-                            index1 += 1
-                        else:
-                            current_weekly_hours, current_daily_hours = self.__add_extra_ot_hours(
-                                wtc_2, current_weekly_hours, current_daily_hours, list2[index2].time_diff
-                            )
-                            index2 += 1
-                    # check if list 1 has hours
-                    elif index1 < len(list1):
-                        current_weekly_hours, current_daily_hours = self.__add_extra_ot_hours(
-                            wtc_1, current_weekly_hours, current_daily_hours, list1[index1].time_diff
-                        )
-                        index1 += 1
-                    # check if list 2 has hours
-                    else:
-                        current_weekly_hours, current_daily_hours = self.__add_extra_ot_hours(
-                            wtc_2, current_weekly_hours, current_daily_hours, list2[index2].time_diff
-                        )
-                        index2 += 1
-            else:
-                current_weekly_hours += total_daily_hours
+            key_wtc_dict_2 = weekly_timesheets[1].key_wtc_dict
+            for employee_key, wtc_1 in weekly_timesheets[0].key_wtc_dict.items():
+                wtc_2 = key_wtc_dict_2.get(employee_key)
+                if wtc_2 and wtc_1.weekly_date_str == wtc_2.weekly_date_str:
+                    extra_ot_hours_list = self.overtime_evaluator.evaluate([wtc_1, wtc_2])
+                    wtc_1.extra_ot_hours, wtc_2.extra_ot_hours = extra_ot_hours_list
 
-    def __has_weekly_ot_hours(self, hours_1, hours_2):
+    def get_employee_keys(self):
         """
-        Check if the combined input hours exceeds the normal weekly hours, and therefore,
-        would qualify for having overtime hours.
-        :param hours1: hours 1
-        :param hours2: hours 2
-        :return: boolean status
+        Get the employee keys in pay period order: the week 1 employees (1st timesheet first)
+        followed by the employees who only worked in a later week.
+        :return: list of employee keys
         """
-        return self.__has_ot_hours(hours_1, hours_2, WeeklyTimeCard.NORMAL_HOURS)
+        employee_keys = {}
+        for weekly_timesheets in self.weekly_timesheets_list:
+            for employee_key in self.__get_weekly_employee_keys(weekly_timesheets):
+                employee_keys[employee_key] = True
+        return list(employee_keys)
 
-    def __has_daily_ot_hours(self, hours_1, hours_2):
+    def get_employee_names(self):
         """
-        Check if the combined input hours exceeds the normal daily hours, and therefore,
-        would qualify for having overtime hours.
-        :param hours1: hours 1
-        :param hours2: hours 2
-        :return: boolean status
+        Get the employee names in pay period order (see `get_employee_keys`).
+        :return: list of employee names
         """
-        return self.__has_ot_hours(hours_1, hours_2, DailyTimeCard.NORMAL_HOURS)
+        return [self.employee_index.get_employee_name(employee_key) for employee_key in self.get_employee_keys()]
 
     @staticmethod
-    def __has_ot_hours(hours_1, hours_2, normal_hours):
+    def __get_weekly_employee_keys(weekly_timesheets):
         """
-        Check if the combined input hours exceeds the normal hours, and therefore,
-        would qualify for having overtime hours.
-        :param hours1: hours 1
-        :param hours2: hours 2
-        :param normal_hours: normal hours
-        :return: boolean status
-        """
-        return hours_1 + hours_2 > normal_hours
-
-    def __add_extra_ot_hours(self, weekly_time_card, current_weekly_hours, current_daily_hours, shift_hours):
+        Get the employee keys for the given weekly timesheets: all the employees of the 1st
+        timesheet followed by the employees who only worked at the 2nd facility.
+        :param weekly_timesheets: list of Timesheet objects
+        :return: generator of employee keys
+        """
+        if weekly_timesheets:
+            key_wtc_dict_1 = weekly_timesheets[0].key_wtc_dict
+            for wtc in weekly_timesheets[0].id_wtc_dict.values():
+                yield wtc.employee.employee_key
+            if len(weekly_timesheets) == 2:
+                for employee_key in weekly_timesheets[1].key_wtc_dict:
+                    if employee_key not in key_wtc_dict_1:
+                        yield employee_key
+
+    def iter_weekly_time_cards(self, weekly_timesheets):
+        """
+        Iterate over the weekly time cards for the given weekly timesheets, one employee at a
+        time.  The time cards of employees who worked at both facilities are merged the first
+        time they are needed, and the merged card is reused afterwards (see
+        `__get_weekly_time_card`).
+        :param weekly_timesheets: list of Timesheet objects
+        :return: generator of WeeklyTimeCard objects
         """
-        Add the extra overtime hours (if any) to the WeeklyTimeCard object, given the current
-        weekly hours, current daily hours, and shift hours. Afterwards, return the newly updated
-        current weekly hours and current daily hours after including the shift hours.
-        :param weekly_time_card: WeeklyTimeCard object
-        :param current_weekly_hours: current weekly hours
-        :param current_daily_hours: current daily hours
-        :param shift_hours: shift hours
-        :return: current weekly hours, current daily hours
-        """
-        extra_ot_hours = self.__get_extra_ot_hours(current_weekly_hours, current_daily_hours, shift_hours)
-        if extra_ot_hours:
-            weekly_time_card.add_extra_ot_hours(extra_ot_hours)
-        current_weekly_hours += shift_hours
-        current_daily_hours += shift_hours
-        return current_weekly_hours, current_daily_hours
-    
-    def __get_extra_ot_hours(self, current_weekly_hours, current_daily_hours, shift_hours):
-        """
-        Get the extra overtime hours based on the current weekly hours, current daily hours,
-        and input shift hours.
-        :param current_weekly_hours: current weekly hours
-        :param current_daily_hours: current daily hours
-        :param shift_hours: shift hours
-        :return: extra overtime hours
-        """
-        weekly_ot_hours = self.__get_weekly_ot_hours(current_weekly_hours, shift_hours)
-        daily_ot_hours = self.__get_daily_ot_hours(current_daily_hours, shift_hours)
-        # use maximum between weekly and daily overtime hours to avoid overlap
-        return max(weekly_ot_hours, daily_ot_hours)
-
-    def __get_weekly_ot_hours(self, current_weekly_hours, shift_hours):
-        """
-        Get the overtime hours from the combined input hours.  More specifically, get the hours
-        that exceed the normal weekly hours, after you combine the input hours.
-        :param current_weekly_hours: current weekly hours
-        :param shift_hours: shift hours
-        :return: overtime hours
-        """
-        return self.__get_ot_hours(current_weekly_hours, shift_hours, WeeklyTimeCard.NORMAL_HOURS)
-
-    def __get_daily_ot_hours(self, current_daily_hours, shift_hours):
-        """
-        Get the overtime hours from the combined input hours.  More specifically, get the hours
-        that exceed the normal daily hours, after you combine the input hours.
-        :param current_daily_hours: current daily hours
-        :param shift_hours: shift hours
-        :return: overtime hours
-        """
-        return self.__get_ot_hours(current_daily_hours, shift_hours, DailyTimeCard.NORMAL_HOURS)
-
-    @staticmethod
-    def __get_ot_hours(current_hours, shift_hours, normal_hours):
-        """
-        Get the overtime hours from the combined input hours.  More specifically, get the hours
-        that exceed the normal hours, after you combine the input hours.
-        :param current_hours: current hours
-        :param shift_hours: shift hours
-        :param normal_hours: normal hours
-        :return: overtime hours
-        """
-        ot_hours = 0
-        if current_hours > normal_hours:
-            ot_hours = shift_hours
-        else:
-            ot_hours = max(current_hours + shift_hours - normal_hours, ot_hours)
-        return ot_hours
+        if len(weekly_timesheets) == 2:
+            for employee_key in self.__get_weekly_employee_keys(weekly_timesheets):
+                yield self.__get_weekly_time_card(employee_key, weekly_timesheets)
+        elif weekly_timesheets:
+            for wtc in weekly_timesheets[0].id_wtc_dict.values():
+                wtc.get_overtime_hours()
+                yield wtc
+
+    def get_summary_hours(self):
+        """
+        Aggregate the summary hours of every pay period and facility in a single pass.
+        :return: SummaryHours object
+        """
+        return SummaryHours(self.iter_pay_periods(), self.weekly_timesheets_list)
+
+    def iter_pay_periods(self):
+        """
+        Iterate over the PayPeriod objects, one employee at a time, in pay period order.  Each
+        PayPeriod object is built on demand, so it can be rendered and released before the next
+        one (the merged weekly time cards are only built once, see `__get_weekly_time_card`).
+        :return: generator of PayPeriod objects
+        """
+        for employee_key in self.get_employee_keys():
+            weekly_time_cards = [
+                self.__get_weekly_time_card(employee_key, weekly_timesheets)
+                for weekly_timesheets in self.weekly_timesheets_list
+            ]
+            first_wtc = next(wtc for wtc in weekly_time_cards if wtc)
+            pay_period = PayPeriod(
+                self.employee_index.get_employee_name(employee_key), first_wtc.employee.facility_name,
+                n_weeks=self.n_weeks
+            )
+            pay_period.weekly_time_cards = weekly_time_cards
+            yield pay_period
+
+    def __get_weekly_time_card(self, employee_key, weekly_timesheets):
+        """
+        Get the weekly time card of the given employee for the given weekly timesheets.  If there
+        are 2 timesheets, then we want to check if a person worked at both facilities and combine
+        there hours into a single (new) time card.  The merged time card is built once and kept,
+        so the summary, the time cards, and the exports share it (and its overtime hours, which
+        are cached on the card).  The overtime hours are calculated right away, so the daily time
+        cards are ready to be rendered.
+        :param employee_key: employee key
+        :param weekly_timesheets: list of Timesheet objects
+        :return: WeeklyTimeCard object (or None if the employee did not work that week)
+        """
+        # only the 1st timesheet is used unless there are exactly 2 facilities
+        merged_timesheets = weekly_timesheets if len(weekly_timesheets) == 2 else weekly_timesheets[:1]
+        wtc_list = [timesheet.key_wtc_dict.get(employee_key) for timesheet in merged_timesheets]
+        wtc = wtc_list[0] if wtc_list and wtc_list[0] else (wtc_list[1] if len(wtc_list) == 2 else None)
+        if len(wtc_list) == 2 and wtc_list[0] and wtc_list[1] \
+                and wtc_list[0].weekly_date_str == wtc_list[1].weekly_date_str:
+            merged_wtc_key = (wtc_list[0], wtc_list[1])
+            wtc = self.merged_wtc_dict.get(merged_wtc_key)
+            if wtc is None:
+                wtc = self.merged_wtc_dict[merged_wtc_key] = self.__get_combined_weekly_time_card(*merged_wtc_key)
+        if wtc:
+            wtc.get_overtime_hours()
+        return wtc
+
+    def __get_combined_weekly_time_card(self, original_wtc, wtc_2):
+        """
+        Get a new WeeklyTimeCard object combining the hours of an employee who worked at both
+        facilities.  The overtime state of the copy is reset, as the facility time cards may
+        already carry the overtime hours adjusted for multiple facilities.
+        :param original_wtc: WeeklyTimeCard object from the 1st timesheet
+        :param wtc_2: WeeklyTimeCard object from the 2nd timesheet
+        :return: WeeklyTimeCard object
+        """
+        # share the (immutable) overtime evaluator instead of copying it
+        wtc = copy.deepcopy(original_wtc, {id(original_wtc.overtime_evaluator): original_wtc.overtime_evaluator})
+        wtc.extra_ot_hours = None
+        wtc.reset_overtime_hours()
+        wtc.employee.facility_name += ' & {0}'.format(wtc_2.employee.facility_name)
+        wtc.total_weekly_hours += wtc_2.total_weekly_hours
+        for idx, daily_time_card_1 in enumerate(wtc.daily_time_card_list):
+            daily_time_card_2 = wtc_2.daily_time_card_list[idx]
+            daily_time_card_1.set_ot_hours = None
+            daily_time_card_1.set_dt_hours = None
+            daily_time_card_1.total_daily_hours += daily_time_card_2.total_daily_hours
+            if daily_time_card_2.in_out_hours_list:
+                if daily_time_card_1.in_out_hours_list:
+                    daily_time_card_1.set_in_out_hours_list(self.__combine_in_out_hour_lists(
+                        daily_time_card_1.in_out_hours_list, daily_time_card_2.in_out_hours_list
+                    ))
+                else:
+                    daily_time_card_1.set_in_out_hours_list(list(daily_time_card_2.in_out_hours_list))
+        return wtc
 
     @staticmethod
     def __combine_in_out_hour_lists(list1, list2):
@@ -284,36 +427,266 @@ class TimeCardGenerator(object):
         combined_list.extend(list2[index2:])
         return combined_list
 
-    def create_html_time_cards(self):
+    def create_html_time_cards(self, output_dir=DEFAULT_OUTPUT_DIR, zip_file_path=DEFAULT_ZIP_FILE_PATH,
+                               html_style=HtmlStyle.INLINE, compression_level=ZipArchiver.DEFAULT_COMPRESSION_LEVEL):
         """
         Create the all the time cards as an html file and store them in a separate folder
-        based on week.  Also, create a zip file of the final output.
+        based on week.  Also, create a zip file of the final output.  Rendering and writing
+        overlap: the cards are rendered on the event loop while a writer task writes the files
+        and zip members in a worker thread, with a bounded queue in between.  The zip members
+        are compressed in parallel (see ZipArchiver).
+        :param output_dir: output directory (ending with `/`)
+        :param zip_file_path: zip file path to create
+        :param html_style: `inline` or `shared` (a single `style.css` and minified html, see HtmlStyle)
+        :param compression_level: zip compression level, from 0 (store-only) to 9
         """
-        # create summary hours first because it will made and adjustments to the daily time cards
-        output_dir = 'output/summary + time cards/'
         self.__create_dir_if_not_exists(output_dir)
-        html_content = self.summary_template.get_populated_template(
-            self.employee_name_pay_period_dict, self.week_1_timesheets, self.week_2_timesheets
+        tc_output_dir = output_dir + 'time cards'
+        week_x_output_dir_list = [
+            '{0}/{1}/'.format(tc_output_dir, self.WEEK_X.format(week_idx + 1)) for week_idx in range(self.n_weeks)
+        ]
+        for week_x_output_dir in week_x_output_dir_list:
+            self.__create_dir_if_not_exists(week_x_output_dir)
+        # the time cards are 2 directories below the summary (`time cards/week X/`)
+        summary_template, wtc_template = self.__get_templates(html_style, tc_dir_depth=2)
+        asyncio.run(self.__write_html_files(
+            output_dir, zip_file_path,
+            self.__get_html_files(output_dir, week_x_output_dir_list, summary_template, wtc_template),
+            compression_level
+        ))
+        print(f"Zip file '{zip_file_path}' has been created.")
+
+    def create_combined_time_cards(self, output_dir=DEFAULT_OUTPUT_DIR, zip_file_path=DEFAULT_ZIP_FILE_PATH,
+                                   group_by=CombinedTimeCards.WEEK, html_style=HtmlStyle.INLINE,
+                                   compression_level=ZipArchiver.DEFAULT_COMPRESSION_LEVEL):
+        """
+        Create the summary and a combined, print-ready document of the time cards per week or
+        per facility (see CombinedTimeCards), instead of an html file per time card.  Also,
+        create a zip file of the summary and the combined documents.
+        :param output_dir: output directory (ending with `/`)
+        :param zip_file_path: zip file path to create
+        :param group_by: `week` or `facility`
+        :param html_style: `inline` or `shared` (a single `style.css` and minified html, see HtmlStyle)
+        :param compression_level: zip compression level, from 0 (store-only) to 9
+        :return: list of the combined document file paths
+        """
+        tc_output_dir = output_dir + 'time cards/'
+        self.__create_dir_if_not_exists(tc_output_dir)
+        summary_template, wtc_template = self.__get_templates(html_style, tc_dir_depth=1)
+        file_paths = []
+        if html_style == HtmlStyle.SHARED:
+            stylesheet_file_path = output_dir + HtmlStyle.STYLESHEET_FILE_NAME
+            self.__write_html_file(
+                stylesheet_file_path, HtmlStyle.get_stylesheet(summary_template.get_styles() + wtc_template.get_styles())
+            )
+            file_paths.append(stylesheet_file_path)
+        summary_file_path = output_dir + 'summary_hours.html'
+        self.__write_html_file(summary_file_path, summary_template.get_populated_template(self.get_summary_hours()))
+        file_paths.append(summary_file_path)
+        combined_file_paths = CombinedTimeCards(wtc_template, group_by=group_by).write(tc_output_dir, self)
+        with ZipArchiver(zip_file_path, compression_level=compression_level) as zip_archiver:
+            for file_path in file_paths + combined_file_paths:
+                zip_archiver.add_file(file_path, os.path.relpath(file_path, output_dir))
+        print(f"Zip file '{zip_file_path}' has been created.")
+        return combined_file_paths
+
+    def __get_templates(self, html_style, tc_dir_depth):
+        """
+        Get the summary and time card templates for the given html style.  The shared stylesheet
+        is next to the summary, and the time cards are the given number of directories below it.
+        :param html_style: `inline` or `shared`
+        :param tc_dir_depth: number of directories between the summary and the time cards
+        :return: (SummaryTemplate object, WeeklyTimeCardTemplate object)
+        """
+        if html_style == HtmlStyle.INLINE:
+            return self.summary_template, self.wtc_template
+        elif html_style == HtmlStyle.SHARED:
+            return (
+                SummaryTemplate(stylesheet_href=HtmlStyle.STYLESHEET_FILE_NAME, minify=True),
+                WeeklyTimeCardTemplate(
+                    stylesheet_href='../' * tc_dir_depth + HtmlStyle.STYLESHEET_FILE_NAME, minify=True
+                )
+            )
+        raise Exception('html_style must be one of {0}'.format(HtmlStyle.MODES))
+
+    def __get_html_files(self, output_dir, week_x_output_dir_list, summary_template, wtc_template):
+        """
+        Render the summary and each time card lazily, one at a time.  The time cards are rendered
+        one pay period at a time, so only the current employee's cards are alive.  With a shared
+        stylesheet (see HtmlStyle), the stylesheet comes first.
+        :param output_dir: output directory
+        :param week_x_output_dir_list: list of output directories, one per week
+        :param summary_template: SummaryTemplate object
+        :param wtc_template: WeeklyTimeCardTemplate object
+        :return: generator of (file path, html content)
+        """
+        if summary_template.stylesheet_href is not None:
+            yield output_dir + HtmlStyle.STYLESHEET_FILE_NAME, HtmlStyle.get_stylesheet(
+                summary_template.get_styles() + wtc_template.get_styles()
+            )
+        yield output_dir + 'summary_hours.html', summary_template.get_populated_template(
+            self.get_summary_hours()
         )
-        self.__write_html_file(output_dir + 'summary_hours.html', html_content)
+        for pay_period in self.iter_pay_periods():
+            for weekly_time_card, week_x_output_dir in zip(pay_period.weekly_time_cards, week_x_output_dir_list):
+                if weekly_time_card:
+                    file_path = '{0}{1}'.format(week_x_output_dir, self.__get_file_name(weekly_time_card))
+                    yield file_path, wtc_template.get_populated_template(weekly_time_card)
+
+    async def __write_html_files(self, output_dir, zip_file_path, html_files, compression_level):
+        """
+        Producer side of the output pipeline: render each html file and queue it for the writer
+        task.  The queue is bounded, so at most `WRITE_QUEUE_SIZE` rendered files are in memory.
+        If rendering fails, then the writer task is cancelled and awaited (so no write is still
+        running when the zip file is closed) and the partial zip file is deleted.
+        :param output_dir: output directory (the zip members are relative to it)
+        :param zip_file_path: zip file path to create
+        :param html_files: iterable of (file path, html content)
+        :param compression_level: zip compression level, from 0 (store-only) to 9
+        """
+        queue = asyncio.Queue(maxsize=self.WRITE_QUEUE_SIZE)
+        try:
+            with ZipArchiver(zip_file_path, compression_level=compression_level) as zip_archiver:
+                writer_task = asyncio.create_task(self.__html_file_writer(queue, zip_archiver, output_dir))
+                try:
+                    for file_path, html_content in html_files:
+                        await queue.put((file_path, html_content))
+                        # yield to the writer task so it can hand the file to its thread while we render
+                        await asyncio.sleep(0)
+                    await queue.put(None)
+                    await writer_task
+                finally:
+                    if not writer_task.done():
+                        writer_task.cancel()
+                        await asyncio.gather(writer_task, return_exceptions=True)
+        except BaseException:
+            if os.path.exists(zip_file_path):
+                os.remove(zip_file_path)
+            raise
+
+    async def __html_file_writer(self, queue, zip_archiver, output_dir):
+        """
+        Consumer side of the output pipeline: write each queued html file and its zip member in
+        a worker thread.  After an error, keep draining the queue so the producer never blocks,
+        and raise the error once the producer is done.  If the writer is cancelled, then the
+        write running in the worker thread (which can not be interrupted) is finished first.
+        :param queue: queue of (file path, html content), ending with None
+        :param zip_archiver: ZipArchiver object
+        :param output_dir: output directory (the zip members are relative to it)
+        """
+        error = None
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            if error is None:
+                file_path, html_content = item
+                write_task = asyncio.ensure_future(asyncio.to_thread(
+                    self.__write_html_file_and_zip_member, file_path, html_content, zip_archiver,
+                    os.path.relpath(file_path, output_dir)
+                ))
+                try:
+                    await asyncio.shield(write_task)
+                except asyncio.CancelledError:
+                    await asyncio.wait([write_task])
+                    raise
+                except Exception as e:
+                    error = e
+        if error is not None:
+            raise error
+
+    @classmethod
+    def __write_html_file_and_zip_member(cls, file_path, html_content, zip_archiver, arcname):
+        """
+        Write the html content to a file and add it to the zip file (it is compressed in the
+        background).
+        :param file_path: file path
+        :param html_content: html content
+        :param zip_archiver: ZipArchiver object
+        :param arcname: name of the zip member
+        """
+        cls.__write_html_file(file_path, html_content)
+        zip_archiver.add(arcname, html_content)
 
-        tc_output_dir = output_dir + 'time cards'
-        self.__populate_tc_html_template(self.week_1_time_cards, '{0}/{1}/'.format(tc_output_dir, self.WEEK_1))
-        self.__populate_tc_html_template(self.week_2_time_cards, '{0}/{1}/'.format(tc_output_dir, self.WEEK_2))
-        self.create_zip_from_directory(output_dir, 'output/summary+time_cards.zip')
+    def export_hours(self, file_path, file_format=HoursExport.CSV):
+        """
+        Export the computed pay period hours as one record per employee per facility per week,
+        streamed to the given file as CSV or NDJSON (no html is rendered).
+        :param file_path: file path
+        :param file_format: `csv` or `ndjson`
+        :return: number of records written
+        """
+        hours_export = HoursExport(file_format=file_format)
+        records = hours_export.get_records(
+            self.get_employee_keys(), self.weekly_timesheets_list
+        )
+        return hours_export.write(file_path, records)
 
-    def __populate_tc_html_template(self, week_x_time_cards, output_dir):
+    def export_shifts(self, file_path, file_format='parquet'):
         """
-        Create each time cards as an html file and store them in the given output directory. 
-        More specifically, populate the html template with the data from each WeeklyTimeCard object.
-        :param week_x_time_cards: list of WeeklyTimeCard objects
-        :param week_x_name: output directory name
+        Export every shift (TimeCardIncrements object) with its regular/overtime split as a row
+        of a columnar Parquet or Arrow file, written in batches.
+        :param file_path: file path
+        :param file_format: `parquet` or `arrow`
+        :return: number of rows written
         """
-        self.__create_dir_if_not_exists(output_dir)
-        for weekly_time_card in week_x_time_cards:
-            file_path = '{0}{1}'.format(output_dir, self.__get_file_name(weekly_time_card))
-            html_content = self.wtc_template.get_populated_template(weekly_time_card)
-            self.__write_html_file(file_path, html_content)
+        # imported lazily as pyarrow is an optional (and slow to import) dependency
+        from shift_export import ShiftExport
+
+        shift_export = ShiftExport(file_format=file_format)
+        rows = shift_export.get_rows(self.weekly_timesheets_list)
+        return shift_export.write(file_path, rows)
+
+    def export_xlsx(self, file_path, layout=XlsxExport.FACILITY):
+        """
+        Export the summary hours and a row per employee per day as an excel workbook, streamed
+        straight from the computed model (see XlsxExport).
+        :param file_path: file path
+        :param layout: `facility` (a sheet per facility) or `day` (a single sheet for every facility)
+        :return: number of time card rows written
+        """
+        return XlsxExport(layout=layout).write(
+            file_path, self.get_summary_hours(), self.iter_pay_periods(), self.weekly_timesheets_list
+        )
+
+    def validate(self):
+        """
+        Dry run: print the totals of each facility and employee and the parse warnings, without
+        rendering or writing the time cards (the workbook is already parsed, merged, and its
+        overtime evaluated by now).
+        :return: ValidationReport object
+        """
+        validation_report = ValidationReport(self)
+        validation_report.print_report()
+        return validation_report
+
+    def create_coverage_report(self, html_file_path, csv_file_path,
+                               minimum_headcount=CoverageReport.DEFAULT_MINIMUM_HEADCOUNT):
+        """
+        Create the staffing coverage of each facility (headcount per time increment per day) as
+        an html heatmap and a CSV file.
+        :param html_file_path: html file path
+        :param csv_file_path: CSV file path
+        :param minimum_headcount: slots staffed below this headcount are under covered
+        :return: number of CSV records written
+        """
+        coverage_report = CoverageReport(minimum_headcount=minimum_headcount)
+        coverage_report.write_html(html_file_path, self.weekly_timesheets_list)
+        return coverage_report.write_csv(csv_file_path, self.weekly_timesheets_list)
+
+    def save_history(self, db_file_path=HistoryStore.DEFAULT_DB_FILE_PATH, source=None):
+        """
+        Append the computed weekly hours and shifts to the local history store, so they can be
+        queried across pay periods (see HistoryStore).
+        :param db_file_path: history store (SQLite) file path
+        :param source: source of the run (ie the excel file name)
+        :return: run id
+        """
+        history_store = HistoryStore(db_file_path)
+        run_id = history_store.append_run(self.weekly_timesheets_list, self.employee_index, source=source)
+        history_store.close()
+        print(f"History of run {run_id} has been saved to '{db_file_path}'.")
+        return run_id
 
     @staticmethod
     def __create_dir_if_not_exists(directory_path):
@@ -355,47 +728,96 @@ class TimeCardGenerator(object):
         print(f"HTML file '{file_path}' has been created.")
 
     @staticmethod
-    def create_zip_from_directory(directory_path, zip_file_path):
+    def create_zip_from_directory(directory_path, zip_file_path, compression_level=ZipArchiver.DEFAULT_COMPRESSION_LEVEL):
         """
-        Create a zip file from the given directory path.
+        Create a zip file from the given directory path.  The files are compressed in parallel
+        and added in a deterministic (sorted) order (see ZipArchiver).
         :param directory_path: directory path
         :param zip_file_path: zip file path to create
+        :param compression_level: zip compression level, from 0 (store-only) to 9
         """
-        with zipfile.ZipFile(zip_file_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        with ZipArchiver(zip_file_path, compression_level=compression_level) as zip_archiver:
             for root, dirs, files in os.walk(directory_path):
-                for file in files:
+                dirs.sort()
+                for file in sorted(files):
                     file_path = os.path.join(root, file)
                     relative_path = os.path.relpath(file_path, directory_path)
-                    zipf.write(file_path, relative_path)
+                    zip_archiver.add_file(file_path, relative_path)
         print(f"Zip file '{zip_file_path}' has been created.")
 
-    def __get_employee_name_pay_period_dict(self, week_1_time_cards, week_2_time_cards):
-        """
-        Get the dictionary of employee name to PayPeriod object using the
-        week 1 time cards and week 2 time cards.
-        :param week_1_time_cards: list of week 1 WeeklyTimeCard objects
-        :param week_2_time_cards: list of week 2 WeeklyTimeCard objects
-        :return: dictionary
-        """
-        employee_name_pay_period_dict = {}
-        # populate the pay periods with the week 1 time cards
-        for wtc_1 in week_1_time_cards:
-            employee_name = wtc_1.employee.employee_name
-            pay_period = PayPeriod(employee_name, wtc_1.employee.facility_name)
-            employee_name_pay_period_dict[employee_name] = pay_period
-            pay_period.weekly_time_card_1 = wtc_1
-        # populate the pay periods with the week 2 time cards
-        for wtc_2 in week_2_time_cards:
-            employee_name = wtc_2.employee.employee_name
-            pay_period = employee_name_pay_period_dict.get(employee_name)
-            if not pay_period:
-                pay_period = PayPeriod(employee_name, wtc_2.employee.facility_name)
-                employee_name_pay_period_dict[employee_name] = pay_period
-            pay_period.weekly_time_card_2 = wtc_2
-        return employee_name_pay_period_dict
-
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate html time cards from an excel schedule.')
+    parser.add_argument(
+        'excel_spreadsheet_filename', nargs='?', default='resources/Schedule Example #3.xlsx',
+        help='excel spreadsheet with a `week X` schedule sheet (per facility) for each week of the pay period'
+    )
+    parser.add_argument(
+        '--profile', action='store_true', help='profile the run and dump a .prof file next to the output'
+    )
+    parser.add_argument(
+        '--profile-stage', choices=['all', 'load', 'render'],
+        help='stage to profile with --profile: the whole run (default), or only loading or rendering'
+    )
+    parser.add_argument(
+        '--combined', choices=CombinedTimeCards.GROUP_BYS,
+        help='render a print-ready document of the time cards per week or per facility instead of a file per time card'
+    )
+    parser.add_argument(
+        '--html-style', choices=HtmlStyle.MODES, default=HtmlStyle.INLINE,
+        help='embed the stylesheet in every html file (default) or link them all to a shared style.css and minify them'
+    )
+    parser.add_argument(
+        '--zip-level', type=int, choices=ZipArchiver.COMPRESSION_LEVELS, default=ZipArchiver.DEFAULT_COMPRESSION_LEVEL,
+        help='zip compression level, from 0 (store-only, the fastest) to 9 (the smallest)'
+    )
+    parser.add_argument(
+        '--export', choices=HoursExport.FILE_FORMATS,
+        help='also export the pay period hours as machine readable records next to the output'
+    )
+    parser.add_argument(
+        '--export-shifts', choices=['parquet', 'arrow'],
+        help='also export every shift as a row of a columnar file next to the output (requires pyarrow)'
+    )
+    parser.add_argument(
+        '--export-xlsx', choices=XlsxExport.LAYOUTS,
+        help='also export the summary and a row per employee per day as an excel workbook next to the output'
+    )
+    parser.add_argument(
+        '--overtime-rules', choices=OvertimeRuleSet.NAMES, default=OvertimeRuleSet.DEFAULT,
+        help='overtime rule set (`california` adds double time after 12 hours and the 7th consecutive day)'
+    )
+    parser.add_argument(
+        '--validate', action='store_true',
+        help='dry run: print the facility and employee totals and the parse warnings instead of rendering the time cards'
+    )
+    parser.add_argument(
+        '--snapshot', action='store_true', help='also save a binary snapshot of the computed run next to the output'
+    )
+    parser.add_argument(
+        '--from-snapshot', metavar='SNAPSHOT_FILE', help='load a previously saved snapshot instead of the excel file'
+    )
+    parser.add_argument(
+        '--history', action='store_true',
+        help='also append the computed hours to the local history store (see history_store.py)'
+    )
+    parser.add_argument(
+        '--history-db', default=HistoryStore.DEFAULT_DB_FILE_PATH, metavar='DB_FILE',
+        help='history store file used with --history (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--coverage', action='store_true',
+        help='also create the staffing coverage of each facility (html heatmap and CSV) next to the output'
+    )
+    parser.add_argument(
+        '--min-headcount', type=int, default=CoverageReport.DEFAULT_MINIMUM_HEADCOUNT, metavar='N',
+        help='slots staffed below this headcount are under covered in the --coverage report (default: %(default)s)'
+    )
+    parser.add_argument('--profile-top', type=int, default=Profiler.DEFAULT_TOP_N, help='number of hot functions to print')
+    args = parser.parse_args()
+    if args.profile_stage and not args.profile:
+        parser.error('--profile-stage requires --profile')
+
     print('Start Testing TimeCardGenerator...\n')
 
     #test_excel_spreadsheet_filename = 'resources/Schedule Example.xlsx'
@@ -405,9 +827,57 @@ if __name__ == "__main__":
     #test_sheet_name = 'REAL ABORN SCHEDULE NO 1-1s jus'
 
     #test_excel_spreadsheet_filename = 'resources/Schedule Example #2.xlsx'
-    test_excel_spreadsheet_filename = 'resources/Schedule Example #3.xlsx'
-    test_tc_generator = TimeCardGenerator(test_excel_spreadsheet_filename)
-    test_tc_generator.create_html_time_cards()
+    profiler = Profiler('output/time_card_generator.prof', top_n=args.profile_top) if args.profile else None
+    profile_stage = (args.profile_stage or 'all') if args.profile else None
+    overtime_rule_set = OvertimeRuleSet.from_name(args.overtime_rules)
+    if args.from_snapshot:
+        load_tc_generator, load_arg = TimeCardGenerator.from_snapshot, args.from_snapshot
+    else:
+        load_tc_generator, load_arg = TimeCardGenerator, args.excel_spreadsheet_filename
+
+    def run_time_card_generator():
+        if profile_stage == 'load':
+            test_tc_generator = profiler.run(load_tc_generator, load_arg, overtime_rule_set=overtime_rule_set)
+        else:
+            test_tc_generator = load_tc_generator(load_arg, overtime_rule_set=overtime_rule_set)
+        if args.combined:
+            render_time_cards = functools.partial(
+                test_tc_generator.create_combined_time_cards, group_by=args.combined, html_style=args.html_style,
+                compression_level=args.zip_level
+            )
+        else:
+            render_time_cards = functools.partial(
+                test_tc_generator.create_html_time_cards, html_style=args.html_style, compression_level=args.zip_level
+            )
+        if args.validate:
+            test_tc_generator.validate()
+        elif profile_stage == 'render':
+            profiler.run(render_time_cards)
+        else:
+            render_time_cards()
+        if args.snapshot:
+            test_tc_generator.save_snapshot('output/summary+time_cards.snap')
+        if args.export:
+            test_tc_generator.export_hours('output/summary_hours.{0}'.format(args.export), file_format=args.export)
+        if args.export_shifts:
+            test_tc_generator.export_shifts(
+                'output/shifts.{0}'.format(args.export_shifts), file_format=args.export_shifts
+            )
+        if args.export_xlsx:
+            test_tc_generator.export_xlsx('output/summary+time_cards.xlsx', layout=args.export_xlsx)
+        if args.coverage:
+            test_tc_generator.create_coverage_report(
+                'output/coverage.html', 'output/coverage.csv', minimum_headcount=args.min_headcount
+            )
+        if args.history:
+            test_tc_generator.save_history(args.history_db, source=load_arg)
+
+    if profile_stage == 'all':
+        # the whole run (snapshot, exports, coverage, history and validation included) in one profile
+        profiler.run(run_time_card_generator)
+    else:
+        run_time_card_generator()
+    if profiler:
+        profiler.dump_stats()
 
     print('\nEnd Testing TimeCardGenerator\n')
- 
\ No newline at end of file
@@ -10,6 +10,11 @@ class TimeCardIncrements(object):
     DEFAULT_TIME_FORMAT = '%I%p'
     MINUTE_TIME_FORMAT = '%I:%M%p'
     DEFAULT_INCREMENT = 3600    # 3600 seconds = 1 hour
+    MIDNIGHT_TIME_STR = '12AM'
+    MINUTES_IN_DAY = 1440
+
+    # time string -> datetime object, shared by every instance (and every run in a long running process)
+    time_str_cache = {}
 
     def __init__(self, start_end_time_str):
         time_str_parts = start_end_time_str.split(self.TIME_SEPARATOR)
@@ -20,6 +25,8 @@ class TimeCardIncrements(object):
         self.start_time = self.convert_time_str(self.start_time_str)
         self.end_time = self.convert_time_str(self.end_time_str)
         self.time_diff = self.__calculate_time_diff(self.start_time, self.end_time)
+        self.start_minute = self.start_time.hour * 60 + self.start_time.minute
+        self.end_minute = self.start_minute + round(self.time_diff * 60)     # past 1440 if it ends the next day
 
     @staticmethod
     def __clean_time_str(time_str):
@@ -33,12 +40,17 @@ class TimeCardIncrements(object):
     def convert_time_str(self, time_str):
         """
         Covert the input time string into a datetime object.  Get the correct time format by 
-        checking for minutes (ie `:`) in the time string.
+        checking for minutes (ie `:`) in the time string.  The schedules only use a handful of
+        distinct time strings, so the parsed values are cached.
         :param time_str: time string
         :return: datetime object
         """
-        time_format = self.MINUTE_TIME_FORMAT if ':' in time_str else self.DEFAULT_TIME_FORMAT
-        return datetime.strptime(time_str, time_format)
+        converted_time = self.time_str_cache.get(time_str)
+        if converted_time is None:
+            time_format = self.MINUTE_TIME_FORMAT if ':' in time_str else self.DEFAULT_TIME_FORMAT
+            converted_time = datetime.strptime(time_str, time_format)
+            self.time_str_cache[time_str] = converted_time
+        return converted_time
     
     def __calculate_time_diff(self, start_time, end_time):
         """
@@ -52,6 +64,35 @@ class TimeCardIncrements(object):
         duration = (end_time - start_time).total_seconds() / self.DEFAULT_INCREMENT
         return duration if (self.start_time <= self.end_time) else duration + 24
     
+    def crosses_midnight(self):
+        """
+        Check if the time card increments end on the next day (ending exactly at midnight does not count).
+        :return: boolean status
+        """
+        return self.end_minute > self.MINUTES_IN_DAY
+
+    def split_at_midnight(self):
+        """
+        Split the time card increments into the hours before and after midnight.
+        :return: TimeCardIncrements object before midnight, TimeCardIncrements object after midnight
+        """
+        before_midnight_tci = TimeCardIncrements('{0}{1}{2}'.format(
+            self.start_time_str, self.TIME_SEPARATOR, self.MIDNIGHT_TIME_STR
+        ))
+        after_midnight_tci = TimeCardIncrements('{0}{1}{2}'.format(
+            self.MIDNIGHT_TIME_STR, self.TIME_SEPARATOR, self.end_time_str
+        ))
+        return before_midnight_tci, after_midnight_tci
+
+    def add_day_offset(self):
+        """
+        Move the start and end minutes by one day, so the time card increments sort (and
+        coalesce) after the hours of the day it is added to.  Used to keep the hours after
+        midnight on the same day when there is no following day.
+        """
+        self.start_minute += self.MINUTES_IN_DAY
+        self.end_minute += self.MINUTES_IN_DAY
+
     def get_start_end_time_str(self):
         """
         Get the start and end time as a string.
@@ -64,6 +105,7 @@ class TimeCardIncrements(object):
         print('Start-End Time Str: {0}'.format(self.get_start_end_time_str()))
         print('Start Time: {0}'.format(self.start_time.time()))
         print('End Time: {0}'.format(self.end_time.time()))
+        print('Start-End Minute: {0}-{1}'.format(self.start_minute, self.end_minute))
         print('Time Difference: {0} hours\n'.format(self.time_diff))
 
 
@@ -84,5 +126,7 @@ if __name__ == "__main__":
     test_me('11pm-12am')
     '''
     test_me('1:25pm-4:10pm')
+    for test_tci in TimeCardIncrements('11pm-7:30am').split_at_midnight():
+        test_tci.display_contents()
 
     print('\nEnd Testing TimeCardIncrements\n')
\ No newline at end of file
@@ -0,0 +1,185 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from time_card_generator import TimeCardGenerator
+from hours_export import HoursExport
+
+
+class TimeCardService(object):
+    """
+    Long running local service that keeps a warm process (pandas already imported, parsed
+    time strings cached by TimeCardIncrements) between payroll runs.  A workbook is uploaded
+    as the raw request body and the service returns either the zip of the summary + time cards
+    or the pay period hours as JSON.  Results are cached by the content hash of the workbook,
+    so re-submitting an unchanged workbook is free.
+    """
+
+    DEFAULT_HOST = '127.0.0.1'
+    DEFAULT_PORT = 8642
+    CACHE_SIZE = 16
+
+    ZIP_FILE_NAME = 'summary+time_cards.zip'
+    OUTPUT_DIR_NAME = 'summary + time cards/'
+
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self.result_cache = OrderedDict()   # (workbook sha256, result type) -> result
+        self.lock = threading.Lock()
+        # import the workbook dependencies once at startup instead of on the first request
+        import pandas
+        import openpyxl
+
+    def __get_cached_result(self, cache_key, create_result):
+        """
+        Get the cached result for the given key, creating (and caching) it if necessary.  Only
+        the results created successfully are cached (an exception is raised to the caller).  The
+        cache evicts the least recently used result once it is full.
+        :param cache_key: cache key
+        :param create_result: function returning the result
+        :return: result
+        """
+        with self.lock:
+            if cache_key in self.result_cache:
+                self.result_cache.move_to_end(cache_key)
+                return self.result_cache[cache_key]
+        result = create_result()
+        with self.lock:
+            self.result_cache[cache_key] = result
+            while len(self.result_cache) > self.cache_size:
+                self.result_cache.popitem(last=False)
+        return result
+
+    def get_time_cards_zip(self, workbook_bytes):
+        """
+        Get the zip file (as bytes) containing the summary + time cards for the given workbook.
+        :param workbook_bytes: excel workbook content
+        :return: zip file content
+        """
+        cache_key = (hashlib.sha256(workbook_bytes).hexdigest(), 'zip')
+        return self.__get_cached_result(cache_key, lambda: self.__create_time_cards_zip(workbook_bytes))
+
+    def get_summary_hours(self, workbook_bytes):
+        """
+        Get the pay period hours records (one per employee per facility per week) for the given workbook.
+        :param workbook_bytes: excel workbook content
+        :return: list of records (dict)
+        """
+        cache_key = (hashlib.sha256(workbook_bytes).hexdigest(), 'summary')
+        return self.__get_cached_result(cache_key, lambda: self.__create_summary_hours(workbook_bytes))
+
+    def __create_time_cards_zip(self, workbook_bytes):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tc_generator = self.__get_tc_generator(temp_dir, workbook_bytes)
+            zip_file_path = os.path.join(temp_dir, self.ZIP_FILE_NAME)
+            tc_generator.create_html_time_cards(
+                output_dir=os.path.join(temp_dir, self.OUTPUT_DIR_NAME), zip_file_path=zip_file_path
+            )
+            with open(zip_file_path, 'rb') as file:
+                return file.read()
+
+    def __create_summary_hours(self, workbook_bytes):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tc_generator = self.__get_tc_generator(temp_dir, workbook_bytes)
+            return list(HoursExport().get_records(
+                tc_generator.get_employee_keys(),
+                tc_generator.weekly_timesheets_list
+            ))
+
+    @staticmethod
+    def __get_tc_generator(temp_dir, workbook_bytes):
+        """
+        Get the TimeCardGenerator object for the given workbook content, which is written to
+        the temporary directory first.  An exception is raised if the content is not an excel
+        workbook or has no `week X` sheet (the request is then rejected).
+        :param temp_dir: temporary directory
+        :param workbook_bytes: excel workbook content
+        :return: TimeCardGenerator object
+        """
+        workbook_path = os.path.join(temp_dir, 'workbook.xlsx')
+        with open(workbook_path, 'wb') as file:
+            file.write(workbook_bytes)
+        return TimeCardGenerator(workbook_path, strict=True)
+
+    def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Serve the time card requests until interrupted.
+        :param host: host name
+        :param port: port number
+        """
+        http_server = ThreadingHTTPServer((host, port), TimeCardRequestHandler)
+        http_server.time_card_service = self
+        print(f"Time card service listening on http://{host}:{port}")
+        try:
+            http_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            http_server.server_close()
+
+
+class TimeCardRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler for the TimeCardService object.
+        GET  /health     -> {"status": "ok"}
+        POST /time-cards -> zip of the summary + time cards (body: excel workbook)
+        POST /summary    -> JSON pay period hours records (body: excel workbook)
+    """
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/health':
+            self.__send_json(200, {'status': 'ok'})
+        else:
+            self.__send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path not in ('/time-cards', '/summary'):
+            self.__send_json(404, {'error': 'not found'})
+            return
+        content_length = int(self.headers.get('Content-Length') or 0)
+        if not content_length:
+            self.__send_json(400, {'error': 'the request body must contain the excel workbook'})
+            return
+        workbook_bytes = self.rfile.read(content_length)
+        service = self.server.time_card_service
+        try:
+            if path == '/time-cards':
+                self.__send(200, 'application/zip', service.get_time_cards_zip(workbook_bytes), {
+                    'Content-Disposition': 'attachment; filename="{0}"'.format(TimeCardService.ZIP_FILE_NAME)
+                })
+            else:
+                self.__send_json(200, service.get_summary_hours(workbook_bytes))
+        except Exception as e:
+            self.__send_json(422, {'error': str(e)})
+
+    def __send_json(self, status, content):
+        self.__send(status, 'application/json', json.dumps(content).encode('utf-8'))
+
+    def __send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the time card generator as a local http service.')
+    parser.add_argument('--host', default=TimeCardService.DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=TimeCardService.DEFAULT_PORT)
+    parser.add_argument('--cache-size', type=int, default=TimeCardService.CACHE_SIZE)
+    args = parser.parse_args()
+
+    TimeCardService(cache_size=args.cache_size).serve_forever(host=args.host, port=args.port)
@@ -1,9 +1,14 @@
 __author__ = "Cal Ochoa"
 __email__ = "CalOchoa@gmail.com"
 
+import sys
+
+import numpy as np
 import pandas as pd
 
 from weekly_time_card import WeeklyTimeCard
+from week_calendar import WeekCalendar
+from time_card_increments import TimeCardIncrements
 from employee import Employee
 
 
@@ -13,22 +18,59 @@ class Timesheet(object):
     WKLY_DATE_ROW_IDX = 1
 
     DAYS = {'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'}
+    MAX_REPORTED_CELLS = 10     # per unknown employee id
 
-    def __init__(self, excel_spreadsheet_filename, sheet_name=None):
+    def __init__(self, excel_spreadsheet_filename, sheet_name=None, overtime_evaluator=None):
+        self.overtime_evaluator = overtime_evaluator
+        self.sheet_name = sheet_name
         self.df = self.__get_data_frame(excel_spreadsheet_filename, sheet_name)
         col1_list = self.__get_col_values(0)
         col2_list = self.__get_col_values(1)
         self.entity_facility_name = self.__get_entity_facility_name(col1_list)
         self.weekly_date_str = self.__get_weekly_date_str()
+        self.week_calendar = None   # parsed once, on the first employee (see `get_week_calendar`)
         self.id_wtc_dict = self.__get_id_wtc_dict(col1_list, col2_list)
+        # roster table: interned employee id -> index into the list of WeeklyTimeCard objects
+        self.roster_idx_dict = {employee_id: idx for idx, employee_id in enumerate(self.id_wtc_dict)}
+        self.roster_wtc_list = list(self.id_wtc_dict.values())
+        self.unknown_id_dict = {}   # unknown employee id -> list of cell names
+        # (WeeklyTimeCard object, day index, start minute, end minute, cell range) of every shift
+        self.shift_ref_list = []
+        self.coverage_matrix = None # headcount per time increment row (rows) per day (columns)
         self.tci_index_list, self.tci_str_list = self.__get_tci_data_lists(col1_list)
         self.__populate_weekly_time_cards()
+        self.__report_unknown_ids()
         self.employee_name_wtc_dict = self.__get_employee_name_wtc_dict()
+        self.key_wtc_dict = {}      # employee key -> WeeklyTimeCard object (set by the EmployeeIndex)
+
+    def get_week_calendar(self):
+        """
+        Get the WeekCalendar object shared by every WeeklyTimeCard object of this timesheet.  The
+        weekly date string is only validated and parsed the first time.
+        :return: WeekCalendar object
+        """
+        if self.week_calendar is None:
+            self.week_calendar = WeekCalendar(self.weekly_date_str)
+        return self.week_calendar
 
     # TODO: add docstrings for all these functions...
     def __get_employee_name_wtc_dict(self):
         return {wtc.employee.employee_name : wtc for wtc in self.id_wtc_dict.values()}
 
+    def add_weekly_time_card(self, weekly_time_card):
+        """
+        Add a WeeklyTimeCard object for an employee who is not on this timesheet (ie an overnight
+        shift from the previous week running into this week's Monday).
+        :param weekly_time_card: WeeklyTimeCard object
+        """
+        employee = weekly_time_card.employee
+        if employee.employee_id in self.id_wtc_dict:
+            # employee ids are only unique within a timesheet
+            employee.employee_id = '{0} ({1})'.format(employee.employee_id, employee.employee_name)
+        self.id_wtc_dict[employee.employee_id] = weekly_time_card
+        self.employee_name_wtc_dict[employee.employee_name] = weekly_time_card
+        self.key_wtc_dict[employee.employee_key] = weekly_time_card
+
     @staticmethod
     def __get_data_frame(excel_spreadsheet_filename, sheet_name):
         """
@@ -108,10 +150,13 @@ class Timesheet(object):
                 if self.__matches_text(col1, 'Total Hours'):
                     break
                 if self.__is_valid_str(col2):
-                    employee_id = col1.strip()
+                    employee_id = sys.intern(col1.strip())
                     employee_name = col2.strip()
                     employee = Employee(employee_id, employee_name, self.entity_facility_name)
-                    id_wtc_dict[employee_id] = WeeklyTimeCard(self.weekly_date_str, employee)
+                    id_wtc_dict[employee_id] = WeeklyTimeCard(
+                        self.weekly_date_str, employee, overtime_evaluator=self.overtime_evaluator,
+                        week_calendar=self.get_week_calendar()
+                    )
             if self.__matches_text(col1, 'Staff'):
                 found_employee = True
         return id_wtc_dict
@@ -166,25 +211,148 @@ class Timesheet(object):
         """
         Populate the WeeklyTimeCard for each employee.  
         1. Get the list of days to list of column indices (ie day index matrix)
-        2. Iterate over each list of column indices for the given day
-        3. Iterate over each column index
-        4. Iterate over each row associated with a time increment
-        5. Find entries where employees are working
-        6. Add the time increments to their daily time card
-        """
-        for day_idx, day_col_idx_list in enumerate(self.__get_day_idx_matrix()):
-            for day_col_idx in day_col_idx_list:
-                col_values = self.__get_col_values(
-                    day_col_idx, start_row=self.tci_index_list[0], end_row=self.tci_index_list[-1]
-                )
-                for tci_str, col_val in zip(self.tci_str_list, col_values):
-                    if self.__is_valid_str(col_val):
-                        employee_id = col_val.strip()
-                        weekly_time_card = self.id_wtc_dict.get(employee_id)
-                        if weekly_time_card:
-                            weekly_time_card.add_time_inc(day_idx, tci_str)
-                        else:
-                            print('Employee ID: `{}` not found'.format(employee_id))
+        2. Get the grid of cells for every day column and time increment row
+        3. Strip the string cells and map them to roster indices in bulk
+        4. Coalesce the runs of the same employee id down a column (ie a shift spanning several
+           contiguous time increment rows) and add a single time increment per run to the
+           daily time card of the employee (column by column, so the cells are visited in the
+           same order as the schedule is read)
+        5. Collect the employee ids not found with their cell names
+        The headcount of each time increment and day (see `__get_coverage_matrix`) is counted
+        from the same cells.
+        """
+        day_col_idx_list = []
+        day_idx_list = []
+        for day_idx, day_col_idxs in enumerate(self.__get_day_idx_matrix()):
+            day_col_idx_list.extend(day_col_idxs)
+            day_idx_list.extend([day_idx] * len(day_col_idxs))
+        start_row = self.tci_index_list[0]
+        n_rows = len(self.tci_index_list)
+        grid = self.df.iloc[start_row:start_row + n_rows, day_col_idx_list]
+        cells = pd.Series(grid.to_numpy(dtype=object).ravel(order='F'))
+        employee_ids = cells[cells.map(type) == str].str.strip()
+        employee_ids = employee_ids[employee_ids != '']
+        self.coverage_matrix = self.__get_coverage_matrix(employee_ids, day_idx_list, n_rows)
+        roster_idxs = employee_ids.map(self.roster_idx_dict)
+        row_tci_list = self.__get_row_tci_list()
+        run = None  # [roster index, column, first row, last row] of the current run
+        for cell_idx, roster_idx in roster_idxs.dropna().astype(int).items():
+            col, row = divmod(cell_idx, n_rows)
+            if run and run[0] == roster_idx and run[1] == col and run[3] == row - 1 \
+                    and self.__is_contiguous(row_tci_list, run[2], row):
+                run[3] = row
+                continue
+            if run:
+                self.__add_run(run, day_idx_list, day_col_idx_list, row_tci_list)
+            run = [roster_idx, col, row, row]
+        if run:
+            self.__add_run(run, day_idx_list, day_col_idx_list, row_tci_list)
+        for cell_idx, employee_id in employee_ids[roster_idxs.isna()].items():
+            col, row = divmod(cell_idx, n_rows)
+            self.unknown_id_dict.setdefault(employee_id, []).append(
+                self.__get_cell_name(start_row + row, day_col_idx_list[col])
+            )
+
+    @staticmethod
+    def __get_coverage_matrix(employee_ids, day_idx_list, n_rows):
+        """
+        Get the headcount of each time increment row and day, counting every employee id found
+        in the grid (an employee in several columns of the same day is only counted once).
+        :param employee_ids: series of stripped employee ids, indexed by cell index (column major)
+        :param day_idx_list: list of day indices (one per column)
+        :param n_rows: number of time increment rows
+        :return: matrix (numpy array) of headcounts, one row per time increment, one column per day
+        """
+        cols, rows = np.divmod(employee_ids.index.to_numpy(), n_rows)
+        slots = pd.DataFrame({
+            'row': rows, 'day': np.asarray(day_idx_list, dtype=int)[cols], 'employee_id': employee_ids.to_numpy()
+        }).drop_duplicates()
+        coverage_matrix = np.zeros((n_rows, WeekCalendar.DAYS_IN_WEEK), dtype=int)
+        np.add.at(coverage_matrix, (slots['row'].to_numpy(), slots['day'].to_numpy()), 1)
+        return coverage_matrix
+
+    def __get_row_tci_list(self):
+        """
+        Get the TimeCardIncrements object of each time increment row, parsed once per timesheet.
+        A row that cannot be parsed is None (it is never coalesced, and fails when it is added).
+        :return: list of TimeCardIncrements objects
+        """
+        row_tci_list = []
+        for tci_str in self.tci_str_list:
+            try:
+                row_tci_list.append(TimeCardIncrements(tci_str))
+            except Exception:
+                row_tci_list.append(None)
+        return row_tci_list
+
+    @staticmethod
+    def __is_contiguous(row_tci_list, first_row, row):
+        """
+        Check if the time increment of the given row starts exactly where the previous row ends,
+        and the run from the first row would still span less than a day.
+        :param row_tci_list: list of TimeCardIncrements objects (one per row)
+        :param first_row: first row of the run
+        :param row: row
+        :return: boolean status
+        """
+        first_tci, previous_tci, tci = row_tci_list[first_row], row_tci_list[row - 1], row_tci_list[row]
+        return first_tci is not None and previous_tci is not None and tci is not None \
+            and previous_tci.end_minute == tci.start_minute \
+            and tci.end_minute - first_tci.start_minute < TimeCardIncrements.MINUTES_IN_DAY
+
+    def __add_run(self, run, day_idx_list, day_col_idx_list, row_tci_list):
+        """
+        Add the time increment of the given run (from the start of its first row to the end of
+        its last row) to the employee's weekly time card, and keep a reference to its cells.
+        :param run: [roster index, column, first row, last row]
+        :param day_idx_list: list of day indices (one per column)
+        :param day_col_idx_list: list of sheet column indices (one per column)
+        :param row_tci_list: list of TimeCardIncrements objects (one per row)
+        """
+        roster_idx, col, first_row, last_row = run
+        wtc = self.roster_wtc_list[roster_idx]
+        if first_row == last_row:
+            tci_str = self.tci_str_list[first_row]
+        else:
+            tci_str = '{0}{1}{2}'.format(
+                row_tci_list[first_row].start_time_str, TimeCardIncrements.TIME_SEPARATOR,
+                row_tci_list[last_row].end_time_str
+            )
+        wtc.add_time_inc(day_idx_list[col], tci_str)
+        cell_range = self.__get_cell_name(self.tci_index_list[first_row], day_col_idx_list[col])
+        if last_row != first_row:
+            cell_range += ':' + self.__get_cell_name(self.tci_index_list[last_row], day_col_idx_list[col])
+        self.shift_ref_list.append((
+            wtc, day_idx_list[col], row_tci_list[first_row].start_minute, row_tci_list[last_row].end_minute, cell_range
+        ))
+
+    @staticmethod
+    def __get_cell_name(row_idx, col_idx):
+        """
+        Get the excel cell name (ie `C12`) for the given row and column indices.
+        :param row_idx: row index
+        :param col_idx: column index
+        :return: cell name
+        """
+        col_name = ''
+        col_number = col_idx + 1
+        while col_number:
+            col_number, remainder = divmod(col_number - 1, 26)
+            col_name = chr(ord('A') + remainder) + col_name
+        return '{0}{1}'.format(col_name, row_idx + 1)
+
+    def __report_unknown_ids(self):
+        """
+        Print a single line for each employee id not found on the roster, with the cells it
+        was found in.
+        """
+        for employee_id, cell_names in self.unknown_id_dict.items():
+            reported_cell_names = ', '.join(cell_names[:self.MAX_REPORTED_CELLS])
+            if len(cell_names) > self.MAX_REPORTED_CELLS:
+                reported_cell_names += ', ...'
+            print('Employee ID: `{0}` not found in {1} cell(s) of sheet `{2}`: {3}'.format(
+                employee_id, len(cell_names), self.sheet_name, reported_cell_names
+            ))
 
     def __get_day_idx_matrix(self):
         """
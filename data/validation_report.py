@@ -0,0 +1,135 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+from summary_hours import SummaryHours
+
+
+class ValidationReport(object):
+    """
+    Dry run of a workbook: the schedules are parsed, merged, and their overtime evaluated, but
+    nothing is rendered or written.  The report is a compact table of the totals of each
+    facility and each employee, followed by the parse warnings (unknown employee ids,
+    overlapping shifts on a sheet, and employees double booked at two facilities).
+    """
+
+    NAME_WIDTH = 40
+    HOURS_WIDTH = 10
+    HOURS_HEADERS = ['Regular', 'Overtime', 'Total']
+
+    def __init__(self, tc_generator):
+        self.tc_generator = tc_generator
+        self.summary_hours = tc_generator.get_summary_hours()
+
+    def get_facility_totals(self):
+        """
+        Get the regular, overtime, and total hours of each facility over the pay period.  The
+        facility hours come from the facility timesheets, which already account for overtime
+        earned across multiple facilities.
+        :return: dictionary of facility name -> [regular hours, overtime hours, total hours]
+        """
+        facility_totals_dict = {}
+        for weekly_timesheets in self.tc_generator.weekly_timesheets_list:
+            for timesheet in weekly_timesheets:
+                totals = facility_totals_dict.setdefault(timesheet.entity_facility_name, [0, 0, 0])
+                for wtc in timesheet.id_wtc_dict.values():
+                    ot_hours = wtc.get_overtime_hours()
+                    totals[0] += wtc.total_weekly_hours - ot_hours
+                    totals[1] += ot_hours
+                    totals[2] += wtc.total_weekly_hours
+        return facility_totals_dict
+
+    def get_employee_totals(self):
+        """
+        Get the regular, overtime, and total hours of each employee (at every facility) over the
+        pay period, in pay period order.
+        :return: list of (employee name, [regular hours, overtime hours, total hours])
+        """
+        return [
+            (employee_name, summary_hours[-3:])
+            for employee_name, _, summary_hours in self.summary_hours.get_rows(SummaryHours.COMBINED)
+        ]
+
+    def get_warnings(self):
+        """
+        Get the parse warnings of every sheet, and the double bookings across sheets.
+        :return: list of warnings
+        """
+        warnings = []
+        for weekly_timesheets in self.tc_generator.weekly_timesheets_list:
+            for timesheet in weekly_timesheets:
+                sheet_name = timesheet.sheet_name or timesheet.entity_facility_name
+                unknown_id_dict = timesheet.unknown_id_dict
+                if unknown_id_dict:
+                    warnings.append('sheet `{0}`: {1} unknown employee id(s) in {2} cell(s): {3}'.format(
+                        sheet_name, len(unknown_id_dict), sum(len(cells) for cells in unknown_id_dict.values()),
+                        ', '.join('`{0}`'.format(employee_id) for employee_id in unknown_id_dict)
+                    ))
+                for wtc in timesheet.id_wtc_dict.values():
+                    n_overlaps = sum(len(dtc.overlap_list) for dtc in wtc.daily_time_card_list)
+                    if n_overlaps:
+                        warnings.append('sheet `{0}`: `{1}` has {2} overlapping shift(s)'.format(
+                            sheet_name, wtc.employee.employee_name, n_overlaps
+                        ))
+        # the double bookings are reported one by one while loading, so only summarize them per employee
+        employee_double_bookings_dict = {}
+        for double_booking in self.tc_generator.double_bookings:
+            employee_double_bookings_dict.setdefault(double_booking.employee_name, []).append(double_booking)
+        for employee_name, double_bookings in employee_double_bookings_dict.items():
+            warnings.append('`{0}` is double booked {1} time(s) for {2} hours'.format(
+                employee_name, len(double_bookings),
+                self.__remove_decimal_if_whole(sum(double_booking.get_overlap_hours() for double_booking in double_bookings))
+            ))
+        return warnings
+
+    def get_lines(self):
+        """
+        Get the lines of the report.
+        :return: list of lines
+        """
+        lines = [self.__get_line('Facility', self.HOURS_HEADERS)]
+        lines.extend(self.__get_line(name, totals) for name, totals in self.get_facility_totals().items())
+        lines.append('')
+        lines.append(self.__get_line('Employee', self.HOURS_HEADERS))
+        lines.extend(self.__get_line(name, totals) for name, totals in self.get_employee_totals())
+        lines.append('')
+        warnings = self.get_warnings()
+        lines.append('Warnings: {0}'.format(len(warnings)))
+        lines.extend('    {0}'.format(warning) for warning in warnings)
+        return lines
+
+    def __get_line(self, name, values):
+        """
+        Get a line of the totals table.
+        :param name: name (1st column)
+        :param values: hours (or headers)
+        :return: line
+        """
+        return '{0:<{1}}'.format(name[:self.NAME_WIDTH - 1], self.NAME_WIDTH) + ''.join(
+            '{0:>{1}}'.format(self.__remove_decimal_if_whole(value), self.HOURS_WIDTH) for value in values
+        )
+
+    @staticmethod
+    def __remove_decimal_if_whole(input_num):
+        """
+        Round the input number to 2 decimals, and remove the decimal if it is a whole number.
+        :param input_num: input number
+        :return: number
+        """
+        if isinstance(input_num, float):
+            input_num = round(input_num, 2)
+            return int(input_num) if input_num.is_integer() else input_num
+        return input_num
+
+    def print_report(self):
+        for line in self.get_lines():
+            print(line)
+
+
+if __name__ == "__main__":
+    from time_card_generator import TimeCardGenerator
+
+    print('Start Testing ValidationReport...\n')
+
+    ValidationReport(TimeCardGenerator('resources/Schedule Example #3.xlsx')).print_report()
+
+    print('\nEnd Testing ValidationReport\n')
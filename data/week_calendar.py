@@ -0,0 +1,119 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+from datetime import datetime, timedelta
+
+from daily_time_card import DailyTimeCard
+
+
+class WeekCalendar(object):
+    """
+    Immutable calendar of a week (Monday to Sunday) parsed from a weekly date string, ie
+    `052923-060423`.  The weekly date string is validated and parsed once per Timesheet, and
+    the calendar (dates, day names, and the dates displayed on the time cards) is shared by
+    every WeeklyTimeCard object of that week.
+    """
+
+    DATE_SEPARATOR = '-'
+    DAYS_IN_WEEK = 7
+    DEFAULT_DATE_FORMAT = '%m%d%y'
+    DATE_FORMAT_OPTIONS = [DEFAULT_DATE_FORMAT, '%m/%d/%y', '%m/%d/%Y']
+
+    __slots__ = ('weekly_date_str', 'date_format', 'dates', 'day_names', 'wtc_dates')
+
+    def __init__(self, weekly_date_str):
+        start_date, end_date, date_format = self.__validate_weekly_date_str(weekly_date_str)
+        dates = tuple(start_date + timedelta(days=idx) for idx in range(self.DAYS_IN_WEEK))
+        set_attr = super().__setattr__
+        set_attr('weekly_date_str', weekly_date_str)
+        set_attr('date_format', date_format)
+        set_attr('dates', dates)
+        set_attr('day_names', tuple(daily_date.strftime('%A') for daily_date in dates))
+        set_attr('wtc_dates', tuple(daily_date.strftime(DailyTimeCard.DEFAULT_DATE_FORMAT) for daily_date in dates))
+
+    def __setattr__(self, name, value):
+        raise Exception('WeekCalendar is immutable')
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        # immutable, so the copies of a WeeklyTimeCard object keep sharing the calendar
+        return self
+
+    def __validate_weekly_date_str(self, weekly_date_str):
+        """
+        Validate the weekly date string and return the start and end dates.  Verify that there is
+        a start and end date.  Verify the start date is a Monday, the end date is a Sunday, and
+        that the dates only span 1 week.
+        :param weekly_date_str: weekly date string
+        :return: start date, end date, date format of the end date
+        """
+        date_str_parts = weekly_date_str.split(self.DATE_SEPARATOR)
+        if len(date_str_parts) != 2:
+            raise Exception('start and end date must be separated by `{0}`'.format(self.DATE_SEPARATOR))
+        start_date, _ = self.__get_date(date_str_parts[0])
+        if start_date.weekday() != 0:
+            raise Exception('start date must be a Monday')
+        end_date, date_format = self.__get_date(date_str_parts[1])
+        if end_date.weekday() != 6:
+            raise Exception('end date must be a Sunday')
+        delta = end_date - start_date
+        if delta.days != self.DAYS_IN_WEEK-1:
+            raise Exception('weekly date string must span a single week')
+        return start_date, end_date, date_format
+
+    def __get_date(self, date_str):
+        """
+        Get the date for the given date string.  Attempt to use different date format options,
+        if necessary.
+        :param date_str: date string
+        :return: date, date format
+        """
+        for date_format in self.DATE_FORMAT_OPTIONS:
+            try:
+                return datetime.strptime(date_str.strip(), date_format).date(), date_format
+            except ValueError:
+                pass
+        raise Exception('date `{0}` must match one of {1}'.format(date_str.strip(), self.DATE_FORMAT_OPTIONS))
+
+    def get_daily_time_card_list(self):
+        """
+        Get a new DailyTimeCard object for each day of the week, sharing the calendar's dates
+        and display strings.
+        :return: list of DailyTimeCard objects
+        """
+        return [
+            DailyTimeCard.from_date(daily_date, wtc_date, day_name)
+            for daily_date, wtc_date, day_name in zip(self.dates, self.wtc_dates, self.day_names)
+        ]
+
+    def is_followed_by(self, week_calendar):
+        """
+        Check whether the given week is the week right after this one (its Monday is the day
+        after this Sunday).
+        :param week_calendar: WeekCalendar object
+        :return: True if the given week follows this one
+        """
+        return week_calendar.dates[0] == self.dates[-1] + timedelta(days=1)
+
+    def __repr__(self):
+        return 'WeekCalendar[Weekly Date Str: {0}, Start: {1}, End: {2}]'.format(
+            self.weekly_date_str, self.dates[0], self.dates[-1]
+        )
+
+
+if __name__ == "__main__":
+    print('Start Testing WeekCalendar...\n')
+
+    test_week_calendar = WeekCalendar(' 052923 - 06/04/2023 ')
+    print(test_week_calendar)
+    print(list(zip(test_week_calendar.wtc_dates, test_week_calendar.day_names)))
+    print(test_week_calendar.is_followed_by(WeekCalendar('060523-061123')), test_week_calendar.is_followed_by(WeekCalendar('061223-061823')))
+    for test_weekly_date_str in ['052923', '053023-060523', '052923-061123', 'May 29-060423']:
+        try:
+            WeekCalendar(test_weekly_date_str)
+        except Exception as e:
+            print('{0}: {1}'.format(test_weekly_date_str, e))
+
+    print('\nEnd Testing WeekCalendar\n')
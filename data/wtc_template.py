@@ -1,24 +1,44 @@
 __author__ = "Cal Ochoa"
 __email__ = "CalOchoa@gmail.com"
 
+from html_style import HtmlStyle
+
 
 class WeeklyTimeCardTemplate(object):
 
     DAYS_OF_WEEK = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
 
-    def __init__(self):
-        pass
+    def __init__(self, stylesheet_href=None, minify=False):
+        """
+        :param stylesheet_href: path of the shared stylesheet relative to the html files (see
+                                HtmlStyle), or None to embed the stylesheet in every file
+        :param minify: True to minify the whitespace of the html
+        """
+        self.stylesheet_href = stylesheet_href
+        self.minify = minify
 
     # TODO: add docstrings/comments for all these functions...
     def get_populated_template(self, weekly_time_card):
         template = self.__get_html_template()
         employee = weekly_time_card.employee
+        return self.__get_html_content(template.format(
+            title=f'{employee.employee_name}\'s Time Card',
+            style=self.__get_template_style(self.__get_style()), 
+            table=self.get_populated_table(weekly_time_card)
+        ))
+
+    def get_populated_table(self, weekly_time_card):
+        """
+        Get the time card table (without the html document around it) of the given weekly time card.
+        :param weekly_time_card: WeeklyTimeCard object
+        :return: table
+        """
+        employee = weekly_time_card.employee
         daily_time_card_list = weekly_time_card.daily_time_card_list
         from_date = daily_time_card_list[0].get_wtc_date()
         to_date = daily_time_card_list[-1].get_wtc_date()
-        return template.format(
-            title=f'{employee.employee_name}\'s Time Card',
-            style=self.__get_style(), 
+        return '''<table>{header_rows}{hours_rows}{entry_rows}{footer_rows}
+            </table>'''.format(
             header_rows=self.__get_header_rows(
                 employee.entity_name.upper(), from_date, to_date, employee.employee_name, 
                 employee.position, employee.facility_name.upper()
@@ -28,6 +48,60 @@ class WeeklyTimeCardTemplate(object):
             footer_rows=self.__get_footer_rows(weekly_time_card)
         )
 
+    def get_combined_head(self, title):
+        """
+        Get the start of a combined (print-ready) document of many time cards: the stylesheet is
+        only included once, and each time card starts on a new page when printed.
+        :param title: title of the document
+        :return: html content
+        """
+        return self.__get_html_content('''
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>{title}</title>{style}
+        </head>
+        <body>'''.format(title=title, style=self.__get_template_style(self.__get_style() + self.__get_page_break_style())))
+
+    def get_combined_card(self, weekly_time_card):
+        """
+        Get the time card of the given weekly time card, as a page of a combined document.
+        :param weekly_time_card: WeeklyTimeCard object
+        :return: html content
+        """
+        return self.__get_html_content('''
+            <div class="time-card">
+            {table}
+            </div>'''.format(table=self.get_populated_table(weekly_time_card)))
+
+    def get_combined_tail(self):
+        """
+        Get the end of a combined document of many time cards.
+        :return: html content
+        """
+        return self.__get_html_content('''
+        </body>
+        </html>
+        ''')
+
+    def get_styles(self):
+        """
+        Get the inline stylesheets of the time cards (used to build the shared stylesheet).
+        :return: list of inline stylesheets
+        """
+        return [self.__get_style(), self.__get_page_break_style()]
+
+    def __get_template_style(self, style):
+        """
+        Get the given inline stylesheet, or the link to the shared stylesheet if there is one.
+        :param style: inline stylesheet
+        :return: style or link tags
+        """
+        return style if self.stylesheet_href is None else HtmlStyle.get_stylesheet_link(self.stylesheet_href)
+
+    def __get_html_content(self, html_content):
+        return HtmlStyle.minify(html_content) if self.minify else html_content
+
     @staticmethod
     def __get_html_template():
         return '''
@@ -38,8 +112,7 @@ class WeeklyTimeCardTemplate(object):
         </head>
         <body>
             <div id="header"></div>
-            <table>{header_rows}{hours_rows}{entry_rows}{footer_rows}
-            </table>
+            {table}
             <div id="footer"></div>
         </body>
         </html>
@@ -103,11 +176,13 @@ class WeeklyTimeCardTemplate(object):
             total_overtime_hours = daily_time_card.get_overtime_hours()
             total_regular_hours = (total_daily_hours - total_overtime_hours) if total_overtime_hours else total_daily_hours
             entry_rows += self.__get_day_row(
-                daily_time_card, total_daily_hours, total_regular_hours, total_overtime_hours
+                daily_time_card, total_daily_hours, total_regular_hours, total_overtime_hours,
+                daily_time_card.get_double_time_hours()
             )
         return entry_rows
 
-    def __get_day_row(self, daily_time_card, total_daily_hours, total_regular_hours, total_overtime_hours):
+    def __get_day_row(self, daily_time_card, total_daily_hours, total_regular_hours, total_overtime_hours,
+                      total_double_time_hours=0):
         day = daily_time_card.get_wtc_day()
         date = daily_time_card.get_wtc_date()
         in_out_hours_cols = ''
@@ -136,7 +211,7 @@ class WeeklyTimeCardTemplate(object):
             day=day, date=date, in_out_hours_cols=in_out_hours_cols, 
             total_daily_hours=self.__remove_decimal_if_whole(total_daily_hours), 
             total_regular_hours=self.__remove_decimal_if_whole(total_regular_hours) if total_regular_hours else '', 
-            total_overtime_hours=self.__remove_decimal_if_whole(total_overtime_hours) if total_overtime_hours else ''
+            total_overtime_hours=self.__get_overtime_hours_str(total_overtime_hours, total_double_time_hours)
         )
 
     @staticmethod
@@ -169,12 +244,27 @@ class WeeklyTimeCardTemplate(object):
             </tr>'''.format(
                 weekly_total_hours=self.__get_display_hours(weekly_time_card.total_weekly_hours), 
                 weekly_regular_hours=self.__get_display_hours(weekly_time_card.get_regular_hours()),
-                weekly_overtime_hours=self.__get_display_hours(weekly_time_card.get_overtime_hours())
+                weekly_overtime_hours=self.__get_overtime_hours_str(
+                    weekly_time_card.get_overtime_hours(), weekly_time_card.get_double_time_hours()
+                )
             )
 
     def __get_display_hours(self, hours):
         return self.__remove_decimal_if_whole(hours) if hours else ''
 
+    def __get_overtime_hours_str(self, overtime_hours, double_time_hours):
+        """
+        Get the overtime hours to display, followed by the double time hours they include if any
+        (ie `6 (2 DT)`).
+        :param overtime_hours: overtime hours
+        :param double_time_hours: double time hours
+        :return: overtime hours string
+        """
+        overtime_hours_str = self.__get_display_hours(overtime_hours)
+        if overtime_hours and double_time_hours:
+            overtime_hours_str = '{0} ({1} DT)'.format(overtime_hours_str, self.__remove_decimal_if_whole(double_time_hours))
+        return overtime_hours_str
+
     @staticmethod
     def __get_style():
         return '''
@@ -254,3 +344,23 @@ class WeeklyTimeCardTemplate(object):
                     margin-top: 20px;
                 }
             </style>'''
+
+    @staticmethod
+    def __get_page_break_style():
+        return '''
+            <style>
+                .time-card {
+                    margin: 20px 0;
+                }
+
+                @media print {
+                    .time-card {
+                        margin: 0;
+                    }
+
+                    .time-card + .time-card {
+                        break-before: page;
+                        page-break-before: always;
+                    }
+                }
+            </style>'''
@@ -0,0 +1,188 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import re
+
+from summary_hours import SummaryHours
+
+
+class XlsxExport(object):
+    """
+    Export the summary and the time cards as an excel workbook.  The workbook is written in
+    openpyxl's write-only (streaming) mode straight from the computed model (no data frame is
+    built), so the rows are flushed to disk as they are appended and memory stays flat for
+    large rosters.  openpyxl is only imported when writing, so the runs that do not export (ie
+    the runs loaded from a snapshot) do not load it.  The 1st sheet has the summary tables,
+    followed by a row per employee per day, using one of the layouts:
+        - `facility`: a sheet per facility with the facility time cards
+        - `day`: a single sheet with the combined (every facility) time cards
+    """
+
+    FACILITY = 'facility'
+    DAY = 'day'
+    LAYOUTS = [FACILITY, DAY]
+
+    SUMMARY_SHEET_TITLE = 'Summary'
+    TIME_CARDS_SHEET_TITLE = 'Time Cards'
+    MAX_SHEET_TITLE_LEN = 31
+    INVALID_SHEET_TITLE_PATTERN = re.compile(r'[\[\]:*?/\\]')
+
+    DAY_HEADERS = [
+        'Staff', 'ID', 'Facility', 'Week', 'Date', 'Day', 'In/Out Hours', 'Hours Worked', 'Regular', 'Overtime', 'Total'
+    ]
+
+    def __init__(self, layout=FACILITY):
+        if layout not in self.LAYOUTS:
+            raise Exception('layout must be one of {0}'.format(self.LAYOUTS))
+        self.layout = layout
+        self.bold_font = None   # set when writing (openpyxl Font object)
+
+    def write(self, file_path, summary_hours, pay_periods, weekly_timesheets_list):
+        """
+        Stream the workbook to the given file path.
+        :param file_path: file path
+        :param summary_hours: SummaryHours object
+        :param pay_periods: iterable of PayPeriod objects (only used by the `day` layout)
+        :param weekly_timesheets_list: list of lists of Timesheet objects, one list per week
+        :return: number of employee day rows written
+        """
+        # imported lazily, see the class docstring
+        from openpyxl import Workbook
+        from openpyxl.styles import Font
+
+        self.bold_font = Font(bold=True)
+        workbook = Workbook(write_only=True)
+        self.__write_summary_sheet(workbook.create_sheet(self.SUMMARY_SHEET_TITLE), summary_hours)
+        count = 0
+        if self.layout == self.FACILITY:
+            sheet_titles = {self.SUMMARY_SHEET_TITLE}
+            for facility_name, facility_wtc_list in self.__get_facility_wtc_lists(weekly_timesheets_list):
+                worksheet = workbook.create_sheet(self.__get_sheet_title(facility_name, sheet_titles))
+                count += self.__write_day_rows(worksheet, facility_wtc_list)
+        else:
+            worksheet = workbook.create_sheet(self.TIME_CARDS_SHEET_TITLE)
+            count += self.__write_day_rows(worksheet, (
+                (week_idx + 1, wtc) for pay_period in pay_periods
+                for week_idx, wtc in enumerate(pay_period.weekly_time_cards) if wtc
+            ))
+        workbook.save(file_path)
+        print(f"Excel file '{file_path}' has been created with {count} time card rows.")
+        return count
+
+    def __get_header_row(self, worksheet, values):
+        """
+        Get a row of bold cells for the given header values.
+        :param worksheet: write-only worksheet
+        :param values: header values
+        :return: list of cells
+        """
+        from openpyxl.cell import WriteOnlyCell
+
+        header_row = []
+        for value in values:
+            cell = WriteOnlyCell(worksheet, value=value)
+            cell.font = self.bold_font
+            header_row.append(cell)
+        return header_row
+
+    def __write_summary_sheet(self, worksheet, summary_hours):
+        """
+        Write the summary tables (the combined table, then a table per facility), one after the
+        other, as in the html summary.
+        :param worksheet: write-only worksheet
+        :param summary_hours: SummaryHours object
+        """
+        week_headers = []
+        for week_idx in range(summary_hours.n_weeks):
+            week_headers.extend(['Week {0} Regular'.format(week_idx + 1), 'Week {0} Overtime'.format(week_idx + 1)])
+        hours_headers = week_headers + ['Total Regular', 'Total Overtime', 'Total']
+        tables = [(SummaryHours.COMBINED, 'Summary Hours', ['Staff', 'Facility'])]
+        tables.extend(
+            (facility_name, facility_name, ['Name', 'IDs']) for facility_name in summary_hours.get_facility_names()
+        )
+        for table_idx, (group, table_name, col_headers) in enumerate(tables):
+            if table_idx:
+                worksheet.append([])
+            worksheet.append(self.__get_header_row(worksheet, [table_name]))
+            worksheet.append(self.__get_header_row(worksheet, col_headers + hours_headers))
+            for employee_name, col_2_value, row_summary_hours in summary_hours.get_rows(group):
+                worksheet.append([employee_name, col_2_value] + row_summary_hours)
+            worksheet.append(self.__get_header_row(worksheet, ['TOTAL', None]) + summary_hours.get_total_summary_hours(group))
+
+    @staticmethod
+    def __get_facility_wtc_lists(weekly_timesheets_list):
+        """
+        Get the weekly time cards of each facility, in week order.
+        :param weekly_timesheets_list: list of lists of Timesheet objects, one list per week
+        :return: list of (facility name, list of (week number, WeeklyTimeCard object))
+        """
+        facility_wtc_lists_dict = {}
+        for week_idx, weekly_timesheets in enumerate(weekly_timesheets_list):
+            for timesheet in weekly_timesheets:
+                facility_wtc_lists_dict.setdefault(timesheet.entity_facility_name, []).extend(
+                    (week_idx + 1, wtc) for wtc in timesheet.id_wtc_dict.values()
+                )
+        return facility_wtc_lists_dict.items()
+
+    def __get_sheet_title(self, name, sheet_titles):
+        """
+        Get a valid and unique sheet title for the given name (excel limits the titles to 31
+        characters, without `[]:*?/\\`).
+        :param name: name
+        :param sheet_titles: set of the sheet titles already used (updated)
+        :return: sheet title
+        """
+        base_title = self.INVALID_SHEET_TITLE_PATTERN.sub(' ', name).strip()[:self.MAX_SHEET_TITLE_LEN] or 'Facility'
+        sheet_title = base_title
+        suffix_idx = 1
+        while sheet_title.lower() in sheet_titles:
+            suffix_idx += 1
+            suffix = ' ({0})'.format(suffix_idx)
+            sheet_title = base_title[:self.MAX_SHEET_TITLE_LEN - len(suffix)] + suffix
+        sheet_titles.add(sheet_title.lower())
+        return sheet_title
+
+    def __write_day_rows(self, worksheet, week_wtc_iter):
+        """
+        Write a row per day of each weekly time card.
+        :param worksheet: write-only worksheet
+        :param week_wtc_iter: iterable of (week number, WeeklyTimeCard object)
+        :return: number of rows written
+        """
+        worksheet.append(self.__get_header_row(worksheet, self.DAY_HEADERS))
+        count = 0
+        for week, wtc in week_wtc_iter:
+            employee = wtc.employee
+            # evaluate the overtime, so the overtime hours of every day are set
+            wtc.get_overtime_hours()
+            for dtc in wtc.daily_time_card_list:
+                overtime_hours = dtc.get_overtime_hours()
+                worksheet.append([
+                    employee.employee_name, employee.employee_id, employee.facility_name, week, dtc.daily_date,
+                    dtc.get_wtc_day(), ', '.join(tci.get_start_end_time_str() for tci in dtc.in_out_hours_list),
+                    dtc.get_daily_hours_worked_str(), self.__remove_decimal_if_whole(dtc.total_daily_hours - overtime_hours),
+                    self.__remove_decimal_if_whole(overtime_hours), self.__remove_decimal_if_whole(dtc.total_daily_hours)
+                ])
+                count += 1
+        return count
+
+    @staticmethod
+    def __remove_decimal_if_whole(input_num):
+        """
+        Remove the decimal if the input number is a whole number.
+        :param input_num: input number
+        :return: number
+        """
+        return int(input_num) if isinstance(input_num, float) and input_num.is_integer() else input_num
+
+
+if __name__ == "__main__":
+    from time_card_generator import TimeCardGenerator
+
+    print('Start Testing XlsxExport...\n')
+
+    test_tc_generator = TimeCardGenerator('resources/Schedule Example #3.xlsx')
+    for test_layout in XlsxExport.LAYOUTS:
+        test_tc_generator.export_xlsx('output/summary+time_cards ({0}).xlsx'.format(test_layout), layout=test_layout)
+
+    print('\nEnd Testing XlsxExport\n')
@@ -0,0 +1,234 @@
+__author__ = "Cal Ochoa"
+__email__ = "CalOchoa@gmail.com"
+
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ZipArchiver(object):
+    """
+    Zip file writer that compresses its members concurrently in a thread pool (zlib releases the
+    GIL while compressing) and appends them to the zip file in the order they were added, so the
+    archive is the same whatever the number of threads.  At most `max_pending` members are
+    waiting to be written, which bounds the memory used.  The compression level goes from 0
+    (store-only: no compression, the fastest for local runs) to 9.  Past 4 GB or 65535 members,
+    the zip64 records are written (as zipfile does), so there is no limit on the archive.  Every
+    member is stamped with the same date and time (`DEFAULT_DATE_TIME` by default) instead of the
+    current time, so the same content gives the same archive byte for byte.
+    """
+
+    STORE = 0
+    DEFAULT_COMPRESSION_LEVEL = 6   # zlib's default
+    COMPRESSION_LEVELS = list(range(10))
+
+    ZIP_STORED = 0
+    ZIP_DEFLATED = 8
+    VERSION = 20                    # version 2.0 (deflate)
+    ZIP64_VERSION = 45              # version 4.5 (zip64)
+    VERSION_MADE_BY = 3 << 8 | ZIP64_VERSION   # unix
+    UTF8_FLAG = 0x800
+    EXTERNAL_ATTR = 0o644 << 16     # -rw-r--r--
+    DEFAULT_DATE_TIME = (1980, 1, 1, 0, 0, 0)   # earliest date of the MS-DOS format
+    MAX_SIZE = 0xFFFFFFFF           # largest size or offset of the headers (the zip64 marker)
+    MAX_MEMBERS = 0xFFFF            # largest number of members of the end record (the zip64 marker)
+    ZIP64_LIMIT = MAX_SIZE          # sizes and offsets from it on are in the zip64 records
+    ZIP64_MEMBERS_LIMIT = MAX_MEMBERS   # numbers of members from it on are in the zip64 records
+    ZIP64_EXTRA_ID = 0x0001
+
+    LOCAL_FILE_HEADER = struct.Struct('<4s5H3L2H')
+    CENTRAL_DIR_HEADER = struct.Struct('<4s6H3L5H2L')
+    END_OF_CENTRAL_DIR = struct.Struct('<4s4H2LH')
+    ZIP64_END_OF_CENTRAL_DIR = struct.Struct('<4sQ2H2L4Q')
+    ZIP64_END_OF_CENTRAL_DIR_LOCATOR = struct.Struct('<4sLQL')
+    ZIP64_EXTRA_HEADER = struct.Struct('<2H')
+
+    def __init__(self, zip_file_path, compression_level=DEFAULT_COMPRESSION_LEVEL, max_workers=None,
+                 date_time=DEFAULT_DATE_TIME):
+        if compression_level not in self.COMPRESSION_LEVELS:
+            raise Exception('compression_level must be one of {0}'.format(self.COMPRESSION_LEVELS))
+        if date_time[0] < 1980:
+            raise Exception('date_time must be from 1980 on (MS-DOS format)')
+        self.zip_file_path = zip_file_path
+        self.compression_level = compression_level
+        self.dos_date, self.dos_time = self.__get_dos_date_time(date_time)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = 4 * self.max_workers
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.pending = deque()          # (arcname, future of the compressed member), in order
+        self.central_dir_headers = []
+        self.file = open(zip_file_path, 'wb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.executor.shutdown(cancel_futures=True)
+            self.file.close()
+
+    def add(self, arcname, content):
+        """
+        Add a member with the given content.  It is compressed in the thread pool and written
+        once the members added before it are written.
+        :param arcname: name of the member in the zip file
+        :param content: content (str, encoded as UTF-8, or bytes)
+        """
+        self.__submit(arcname, self.__compress, content)
+
+    def add_file(self, file_path, arcname):
+        """
+        Add a member with the content of the given file (the file is read in the thread pool).
+        :param file_path: file path
+        :param arcname: name of the member in the zip file
+        """
+        self.__submit(arcname, self.__compress_file, file_path)
+
+    def close(self):
+        """
+        Write the remaining members and the central directory, and close the zip file.
+        """
+        try:
+            while self.pending:
+                self.__write_member(*self.pending.popleft())
+            self.__write_central_dir()
+        finally:
+            self.executor.shutdown()
+            self.file.close()
+
+    def __submit(self, arcname, func, arg):
+        """
+        Submit the compression of a member, then write the members at the head of the queue that
+        are already compressed (waiting for the oldest one if the queue is full).
+        :param arcname: name of the member in the zip file
+        :param func: compression function
+        :param arg: argument of the compression function
+        """
+        self.pending.append((arcname, self.executor.submit(func, arg)))
+        while self.pending and (len(self.pending) > self.max_pending or self.pending[0][1].done()):
+            self.__write_member(*self.pending.popleft())
+
+    def __compress_file(self, file_path):
+        with open(file_path, 'rb') as file:
+            return self.__compress(file.read())
+
+    def __compress(self, content):
+        """
+        Compress the given content (raw deflate, as stored in a zip file).
+        :param content: content (str or bytes)
+        :return: (compression method, CRC-32, uncompressed size, compressed content)
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        crc = zlib.crc32(content)
+        if self.compression_level == self.STORE:
+            return self.ZIP_STORED, crc, len(content), content
+        compressor = zlib.compressobj(self.compression_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return self.ZIP_DEFLATED, crc, len(content), compressor.compress(content) + compressor.flush()
+
+    @staticmethod
+    def __get_dos_date_time(date_time):
+        """
+        Get the given date and time in the MS-DOS format of the zip headers.
+        :param date_time: (year, month, day, hour, minute, second)
+        :return: (date, time)
+        """
+        year, month, day, hour, minute, second = date_time
+        return (year - 1980) << 9 | month << 5 | day, hour << 11 | minute << 5 | second // 2
+
+    def __get_zip64_extra(self, values):
+        """
+        Get the zip64 extra field holding the given values that do not fit in the headers (the
+        values past the limit are replaced by the zip64 marker in the headers).
+        :param values: sizes and offset, in the order of the zip64 extra field
+        :return: (values for the headers, zip64 extra field, or empty bytes if not needed)
+        """
+        zip64_values = [value for value in values if value >= self.ZIP64_LIMIT]
+        if not zip64_values:
+            return values, b''
+        header_values = [self.MAX_SIZE if value >= self.ZIP64_LIMIT else value for value in values]
+        return header_values, self.ZIP64_EXTRA_HEADER.pack(
+            self.ZIP64_EXTRA_ID, 8 * len(zip64_values)
+        ) + struct.pack('<{0}Q'.format(len(zip64_values)), *zip64_values)
+
+    def __write_member(self, arcname, future):
+        """
+        Write the local file header and the compressed content of a member.
+        :param arcname: name of the member in the zip file
+        :param future: future of the compressed member (see `__compress`)
+        """
+        compression_method, crc, size, compressed_content = future.result()
+        offset = self.file.tell()
+        try:
+            encoded_arcname, flags = arcname.encode('ascii'), 0
+        except UnicodeEncodeError:
+            encoded_arcname, flags = arcname.encode('utf-8'), self.UTF8_FLAG
+        # the zip64 extra field has both sizes in the local header, and only the large values in the central one
+        if max(size, len(compressed_content)) >= self.ZIP64_LIMIT:
+            local_extra = self.ZIP64_EXTRA_HEADER.pack(self.ZIP64_EXTRA_ID, 16) + struct.pack(
+                '<2Q', size, len(compressed_content)
+            )
+            local_size = local_compressed_size = self.MAX_SIZE
+        else:
+            local_extra, local_size, local_compressed_size = b'', size, len(compressed_content)
+        (central_size, central_compressed_size, central_offset), central_extra = self.__get_zip64_extra(
+            [size, len(compressed_content), offset]
+        )
+        version = self.ZIP64_VERSION if central_extra else self.VERSION
+        self.file.write(self.LOCAL_FILE_HEADER.pack(
+            b'PK\x03\x04', version, flags, compression_method, self.dos_time, self.dos_date,
+            crc, local_compressed_size, local_size, len(encoded_arcname), len(local_extra)
+        ))
+        self.file.write(encoded_arcname)
+        self.file.write(local_extra)
+        self.file.write(compressed_content)
+        self.central_dir_headers.append(self.CENTRAL_DIR_HEADER.pack(
+            b'PK\x01\x02', self.VERSION_MADE_BY, version, flags, compression_method, self.dos_time, self.dos_date,
+            crc, central_compressed_size, central_size, len(encoded_arcname), len(central_extra), 0, 0, 0,
+            self.EXTERNAL_ATTR, central_offset
+        ) + encoded_arcname + central_extra)
+
+    def __write_central_dir(self):
+        """
+        Write the central directory (the header of every member) and its end record, preceded by
+        the zip64 end record and its locator if the archive is past the limits.
+        """
+        n_members = len(self.central_dir_headers)
+        central_dir_offset = self.file.tell()
+        for central_dir_header in self.central_dir_headers:
+            self.file.write(central_dir_header)
+        central_dir_size = self.file.tell() - central_dir_offset
+        if (n_members >= self.ZIP64_MEMBERS_LIMIT or central_dir_offset >= self.ZIP64_LIMIT or
+                central_dir_size >= self.ZIP64_LIMIT):
+            zip64_end_offset = self.file.tell()
+            self.file.write(self.ZIP64_END_OF_CENTRAL_DIR.pack(
+                b'PK\x06\x06', self.ZIP64_END_OF_CENTRAL_DIR.size - 12, self.VERSION_MADE_BY, self.ZIP64_VERSION,
+                0, 0, n_members, n_members, central_dir_size, central_dir_offset
+            ))
+            self.file.write(self.ZIP64_END_OF_CENTRAL_DIR_LOCATOR.pack(b'PK\x06\x07', 0, zip64_end_offset, 1))
+            n_members = min(n_members, self.MAX_MEMBERS)
+            central_dir_size = min(central_dir_size, self.MAX_SIZE)
+            central_dir_offset = min(central_dir_offset, self.MAX_SIZE)
+        self.file.write(self.END_OF_CENTRAL_DIR.pack(
+            b'PK\x05\x06', 0, 0, n_members, n_members, central_dir_size, central_dir_offset, 0
+        ))
+
+
+if __name__ == "__main__":
+    import zipfile
+
+    print('Start Testing ZipArchiver...\n')
+
+    for test_compression_level in [ZipArchiver.STORE, ZipArchiver.DEFAULT_COMPRESSION_LEVEL]:
+        test_zip_file_path = 'output/test_zip_archiver_{0}.zip'.format(test_compression_level)
+        with ZipArchiver(test_zip_file_path, compression_level=test_compression_level) as test_zip_archiver:
+            for test_idx in range(100):
+                test_zip_archiver.add('test/member_{0}.txt'.format(test_idx), 'line {0}\n'.format(test_idx) * 1000)
+        with zipfile.ZipFile(test_zip_file_path) as test_zipf:
+            print(test_zip_file_path, len(test_zipf.namelist()), 'members, bad member:', test_zipf.testzip())
+
+    print('\nEnd Testing ZipArchiver\n')